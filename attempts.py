@@ -0,0 +1,65 @@
+import os
+
+from parallel import _solve_group, run_jobs
+from scoring import score_timetable
+
+
+# =========================================================
+# SEEDED BEST-OF-N GENERATION
+# =========================================================
+# Runs the same placement N times, each from its own random.Random(seed), and
+# keeps the attempt with the best score (see scoring.py). The winning seed
+# replays the same timetable from the same starting state, so a good result
+# can be reproduced with attempts=1 and that seed (solver attempts that run out
+# of time budget excepted).
+
+DEFAULT_ATTEMPTS = 8
+
+
+def _run_attempt(job):
+    days, periods_per_day, break_after_periods, busy, classes, mode, time_budget, seed = job
+    # The engine marks placements into the busy masks it is given; keep the originals for scoring
+    own_busy = {fid: list(masks) for fid, masks in busy.items()}
+    rows, unplaced_by_class, timed_out = _solve_group((days, periods_per_day, break_after_periods, own_busy,
+                                                       classes, mode, time_budget, seed))
+    course_types = {c["course_id"]: c["course_type"] for _, _, courses_list in classes for c in courses_list}
+    return {
+        "seed": seed,
+        "quality": score_timetable(days, rows, unplaced_by_class, course_types, busy),
+        "rows": rows,
+        "unplaced_by_class": unplaced_by_class,
+        "timed_out": timed_out,
+    }
+
+
+def best_of_n(engine, classes, mode="greedy", time_budget=None, attempts=DEFAULT_ATTEMPTS, base_seed=0,
+              workers=None):
+    """
+    Places classes `attempts` times with seeds base_seed, base_seed + 1, ... in the
+    shared process pool (see parallel.py) when more than one CPU is available. Returns (best, summaries):
+    best is the winning attempt {"seed", "quality", "rows", "unplaced_by_class", "timed_out"},
+    summaries lists {"seed", "score"} for every attempt.
+    """
+    attempts = max(1, int(attempts))
+    workers = min(workers or os.cpu_count() or 1, attempts)
+
+    # Attempts beyond the worker count queue up, so they share the budget
+    attempt_budget = time_budget * min(1.0, workers / attempts) if time_budget else time_budget
+
+    faculty_ids = {c["faculty_id"] for _, _, courses_list in classes for c in courses_list}
+    busy = {fid: list(engine.faculty_busy[fid]) for fid in faculty_ids if fid in engine.faculty_busy}
+    # sqlite3.Row does not pickle, so ship plain dicts to the workers
+    plain = [(dept_id, semester, [dict(c) for c in courses_list]) for dept_id, semester, courses_list in classes]
+    jobs = [(engine.days, engine.periods_per_day, engine.break_after_periods, busy, plain,
+             mode, attempt_budget, base_seed + n) for n in range(attempts)]
+
+    if workers <= 1:
+        results = [_run_attempt(job) for job in jobs]
+    else:
+        results = [None] * len(jobs)
+        for n, result in run_jobs(_run_attempt, jobs, workers):
+            results[n] = result
+
+    # Ties go to the lowest seed, so the choice does not depend on completion order
+    best = max(results, key=lambda r: (r["quality"]["score"], -r["seed"]))
+    return best, [{"seed": r["seed"], "score": r["quality"]["score"]} for r in results]
@@ -0,0 +1,244 @@
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+
+# =========================================================
+# GENERATOR BENCHMARK
+# =========================================================
+# Builds a synthetic institution in a throwaway SQLite file, runs
+# generate_timetable_logic on it under a fixed seed and writes wall time, peak
+# memory and placement rates as JSON, so runs can be compared across commits:
+#
+#   python benchmark.py --depts 12 --mode solver --out bench.json
+#   python benchmark.py --scenario small --scenario large --repeat 3
+
+SCENARIOS = {
+    "small": dict(depts=3, semesters=4, faculties=5, courses=5, labs=1),
+    "medium": dict(depts=8, semesters=4, faculties=8, courses=6, labs=2),
+    "large": dict(depts=20, semesters=8, faculties=12, courses=6, labs=2),
+}
+
+DAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+CREDIT_CHOICES = (3, 4, 4, 5)
+
+
+def synthetic_institution(depts, semesters, faculties, courses, labs, seed):
+    """Returns {"departments", "faculties", "courses"} records in the format importer.py accepts."""
+    rng = random.Random(seed)
+    data = {"departments": [], "faculties": [], "courses": []}
+    faculty_id = 0
+    for d in range(1, depts + 1):
+        data["departments"].append({"dept_id": d, "dept_name": f"Department {d}"})
+        dept_faculties = []
+        for _ in range(faculties):
+            faculty_id += 1
+            dept_faculties.append(faculty_id)
+            data["faculties"].append({"faculty_id": faculty_id, "faculty_name": f"Faculty {faculty_id}",
+                                      "dept_id": d})
+        for s in range(1, semesters + 1):
+            for k in range(courses + labs):
+                is_lab = k >= courses
+                data["courses"].append({
+                    "course_name": f"{'Lab' if is_lab else 'Course'} {d}-{s}-{k}",
+                    "course_code": f"{'LB' if is_lab else 'CS'}{d:02d}{s}{k:02d}",
+                    "semester": s,
+                    "credits": 2 if is_lab else rng.choice(CREDIT_CHOICES),
+                    "faculty_id": rng.choice(dept_faculties),
+                    "dept_id": d,
+                    "course_type": "lab" if is_lab else "theory",
+                })
+    return data
+
+
+def break_details(spec, break_minutes=15):
+    """"2,4" -> [{"after_period": 2, "duration": 15}, {"after_period": 4, "duration": 15}]"""
+    return [{"after_period": int(p), "duration": break_minutes} for p in spec.split(",") if p.strip()]
+
+
+def build_database(path, options):
+    from app import app, get_db, nav_departments_cache
+    from migrations import migrate
+    from importer import import_records
+    from settings import settings_cache
+
+    # Versions restart at 0 in every fresh file, so the per-process caches must be dropped
+    if path is not None:  # None: the database already configured (e.g. DATABASE_URL)
+        app.config["DATABASE"] = path
+    settings_cache.clear()
+    nav_departments_cache.clear()
+    with app.app_context():
+        conn = get_db()
+        migrate(conn)
+        breaks = break_details(options.breaks)
+        conn.execute("""
+            INSERT INTO timetable_settings
+            (periods_per_day, period_duration, number_of_breaks, break_details, working_days, start_time)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (options.periods, 50, len(breaks), json.dumps(breaks), ",".join(DAY_NAMES[:options.days]), "09:00"))
+        data = synthetic_institution(options.depts, options.semesters, options.faculties, options.courses,
+                                     options.labs, options.seed)
+        report = import_records(conn, data)
+        if report["errors"]:
+            raise RuntimeError(f"Synthetic data was rejected: {report['errors'][:3]}")
+        conn.commit()
+        return {name: len(records) for name, records in data.items()}
+
+
+def placement_rates(conn, report):
+    """Placed / required periods per course type, from the saved rows plus the unplaced report."""
+    placed = {"theory": 0, "lab": 0}
+    for row in conn.execute("""
+        SELECT c.course_type, COUNT(*) FROM generated_timetable gt
+        JOIN courses c ON gt.course_id = c.course_id
+        GROUP BY c.course_type
+    """).fetchall():
+        placed[row[0]] = row[1]
+    unplaced = {"theory": 0, "lab": 0}
+    for entry in report["unplaced"]:
+        unplaced[entry["course_type"]] += entry["periods"]
+
+    rates = {}
+    for course_type in ("theory", "lab"):
+        required = placed[course_type] + unplaced[course_type]
+        rates[course_type] = {
+            "placed_periods": placed[course_type],
+            "required_periods": required,
+            "rate": round(placed[course_type] / required, 4) if required else 1.0,
+        }
+    return rates
+
+
+def run_generation(path, options):
+    from app import app, get_db, generate_timetable_logic
+
+    app.config["DATABASE"] = path
+    with app.app_context():
+        conn = get_db()
+        dept_ids = [row[0] for row in conn.execute("SELECT dept_id FROM departments ORDER BY dept_id")]
+
+        random.seed(options.seed)
+        tracemalloc.start()
+        started = time.perf_counter()
+        success, message, report = generate_timetable_logic(dept_ids, mode=options.mode,
+                                                             time_budget=options.time_budget,
+                                                             parallel=options.parallel,
+                                                             attempts=options.attempts,
+                                                             seed=options.seed if options.attempts else None,
+                                                             optimize=options.optimize,
+                                                             optimize_budget=options.optimize_budget)
+        wall_time = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        if not success:
+            raise RuntimeError(message)
+        return {
+            "wall_time_s": round(wall_time, 4),
+            "peak_memory_kb": round(peak / 1024, 1),
+            "phase_seconds": report["phase_seconds"],
+            "placement": placement_rates(conn, report),
+            "timed_out": report["timed_out"],
+            "quality": report.get("quality"),
+            "optimizer": report.get("optimizer"),
+        }
+
+
+def benchmark(options):
+    """One scenario: a fresh database per repeat so every run starts from the same state."""
+    runs = []
+    sizes = None
+    for _ in range(options.repeat):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "benchmark.db")
+            sizes = build_database(path, options)
+            runs.append(run_generation(path, options))
+
+    wall_times = sorted(run["wall_time_s"] for run in runs)
+    return {
+        "scenario": options.scenario or "custom",
+        "config": {name: getattr(options, name) for name in
+                   ("depts", "semesters", "faculties", "courses", "labs", "days", "periods", "breaks",
+                    "mode", "parallel", "attempts", "optimize", "optimize_budget", "time_budget",
+                    "seed")},
+        "institution": sizes,
+        "wall_time_s": {"min": wall_times[0], "median": wall_times[len(wall_times) // 2],
+                        "max": wall_times[-1]},
+        "peak_memory_kb": max(run["peak_memory_kb"] for run in runs),
+        "placement": runs[0]["placement"],
+        "timed_out": any(run["timed_out"] for run in runs),
+        "quality": runs[0]["quality"],
+        "runs": runs,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark timetable generation on a synthetic institution.")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Preset size (repeatable). Size flags below override it.")
+    parser.add_argument("--depts", type=int)
+    parser.add_argument("--semesters", type=int)
+    parser.add_argument("--faculties", type=int, help="Faculties per department.")
+    parser.add_argument("--courses", type=int, help="Theory courses per semester.")
+    parser.add_argument("--labs", type=int, help="Lab courses per semester.")
+    parser.add_argument("--days", type=int, default=5, help="Working days per week (1-7).")
+    parser.add_argument("--periods", type=int, default=7, help="Periods per day.")
+    parser.add_argument("--breaks", default="2,4", help="Comma-separated periods followed by a break.")
+    parser.add_argument("--mode", choices=("greedy", "solver"), default="greedy")
+    parser.add_argument("--parallel", action="store_true")
+    parser.add_argument("--attempts", type=int, help="Seeded best-of-N attempts (seeds start at --seed).")
+    parser.add_argument("--time-budget", type=float, default=10.0)
+    parser.add_argument("--optimize", action="store_true", help="Run the local-search pass after placement.")
+    parser.add_argument("--optimize-budget", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--out", help="Write results JSON here (default: stdout).")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not 1 <= args.days <= len(DAY_NAMES):
+        raise SystemExit("--days must be between 1 and 7")
+    results = []
+    for scenario in args.scenario or [None]:
+        options = argparse.Namespace(**vars(args))
+        options.scenario = scenario
+        for name, value in SCENARIOS[scenario or "medium"].items():
+            if getattr(options, name) is None:
+                setattr(options, name, value)
+        results.append(benchmark(options))
+        print(f"{results[-1]['scenario']}: {results[-1]['wall_time_s']['median']}s, "
+              f"theory {results[-1]['placement']['theory']['rate']:.1%}, "
+              f"lab {results[-1]['placement']['lab']['rate']:.1%}", file=sys.stderr)
+
+    output = json.dumps({
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "results": results,
+    }, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
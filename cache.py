@@ -0,0 +1,57 @@
+import threading
+
+
+# =========================================================
+# VERSIONED CACHES
+# =========================================================
+# data_versions keeps one counter per cached dataset. Writers bump the counter
+# in the same transaction as their change, and every worker process reloads
+# its copy once the counter it reads back differs from the one it cached. A
+# single primary-key lookup replaces re-reading the dataset on every request.
+
+def get_version(conn, name):
+    row = conn.execute("SELECT version FROM data_versions WHERE name=?", (name,)).fetchone()
+    return row[0] if row else 0
+
+
+def get_versions(conn, names):
+    """Returns the versions of several datasets, in the order given, with one query."""
+    placeholders = ",".join("?" * len(names))
+    rows = conn.execute(f"SELECT name, version FROM data_versions WHERE name IN ({placeholders})",
+                        tuple(names)).fetchall()
+    found = {row[0]: row[1] for row in rows}
+    return tuple(found.get(name, 0) for name in names)
+
+
+def bump_version(conn, name):
+    """Increments a dataset's version. Part of the caller's transaction — the caller commits."""
+    conn.execute("""
+        INSERT INTO data_versions (name, version) VALUES (?, 1)
+        ON CONFLICT(name) DO UPDATE SET version = version + 1
+    """, (name,))
+
+
+class VersionedCache:
+    """Per-process cache of load(conn), reloaded whenever the dataset's version changes."""
+
+    def __init__(self, name, load):
+        self.name = name
+        self.load = load
+        self._lock = threading.Lock()
+        self._version = None
+        self._value = None
+
+    def get(self, conn):
+        version = get_version(conn, self.name)
+        with self._lock:
+            if version == self._version:
+                return self._value
+        # Load outside the lock; a concurrent writer only makes the next get() reload again
+        value = self.load(conn)
+        with self._lock:
+            self._version, self._value = version, value
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._version = self._value = None
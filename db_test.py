@@ -1,19 +1,218 @@
-import mysql.connector
+import sys
+import threading
+import time
 
-# connect to mysql
-mydb = mysql.connector.connect(
-    host="localhost",
-    user="root",
-    password="root123",
-    database="timetable_db"
-)
+from database import (ConnectionPool, MySQLConnection, PoolTimeout, default_url, get_connection,
+                      translate)
 
-print("Connected successfully!")
 
-mycursor = mydb.cursor()
+# Checks the configured database (TIMETABLE_DB_URL, else the TIMETABLE_DB SQLite file):
+#   python db_test.py
+# or, without a MySQL server, the MySQL backend's pool and SQL translation
+# against stand-in connections:
+#   python db_test.py --stand-in
 
-# check admin table
-mycursor.execute("SELECT * FROM admin")
+def check_configured():
+    conn = get_connection()
+    print(f"Connected to {default_url().split('@')[-1]} ({conn.dialect})")
 
-for x in mycursor:
-    print(x)
+    cur = conn.cursor()
+    for table in ("departments", "faculties", "courses", "generated_timetable"):
+        cur.execute(f"SELECT COUNT(*) FROM {table}")
+        print(f"{table}: {cur.fetchone()[0]} rows")
+
+    conn.close()
+
+
+# =========================================================
+# MYSQL STAND-IN
+# =========================================================
+# (statement as the app writes it, statement pymysql receives)
+TRANSLATIONS = [
+    ("SELECT * FROM courses WHERE dept_id=? AND semester=?",
+     "SELECT * FROM courses WHERE dept_id=%s AND semester=%s"),
+    # pymysql %-formats every statement, so literal % is doubled; ? inside literals stays
+    ("SELECT course_name FROM courses WHERE course_code LIKE 'CS%' AND course_name <> '?' AND dept_id=?",
+     "SELECT course_name FROM courses WHERE course_code LIKE 'CS%%' AND course_name <> '?' AND dept_id=%s"),
+    ("SELECT 'it''s 100% ?', \"50%\" FROM t WHERE a=?",
+     "SELECT 'it''s 100%% ?', \"50%%\" FROM t WHERE a=%s"),
+    ("SELECT period % 2 FROM generated_timetable WHERE faculty_id=?",
+     "SELECT period %% 2 FROM generated_timetable WHERE faculty_id=%s"),
+    ("""INSERT INTO data_versions (name, version) VALUES (?, 1)
+        ON CONFLICT(name) DO UPDATE SET version = version + 1""",
+     """INSERT INTO data_versions (name, version) VALUES (%s, 1)
+        ON DUPLICATE KEY UPDATE version = version + 1"""),
+    ("INSERT OR REPLACE INTO timetable_snapshots (kind, snapshot_key, payload) VALUES (?, ?, ?)",
+     "REPLACE INTO timetable_snapshots (kind, snapshot_key, payload) VALUES (%s, %s, %s)"),
+    ("BEGIN IMMEDIATE", "START TRANSACTION"),
+    ("BEGIN", "START TRANSACTION"),
+    ("CREATE TABLE t(id INTEGER PRIMARY KEY AUTOINCREMENT)", "CREATE TABLE t(id INTEGER PRIMARY KEY AUTO_INCREMENT)"),
+    ("CREATE INDEX IF NOT EXISTS idx_t ON t(a)", "CREATE INDEX idx_t ON t(a)"),
+]
+
+
+class StandInCursor:
+    def __init__(self, raw):
+        self._raw = raw
+        self.description = None
+        self.lastrowid = None
+        self.rowcount = -1
+        self._rows = []
+
+    def execute(self, sql, params):
+        self._raw.executed.append((sql, params))
+        if self._raw.fail_next:
+            self._raw.fail_next = False
+            raise RuntimeError("stand-in query failure")
+        self.description = (("dept_id",), ("dept_name",))
+        self._rows = [(1, "CSE")]
+
+    def executemany(self, sql, params):
+        self._raw.executed.append((sql, params))
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def close(self):
+        pass
+
+
+class StandInConnection:
+    """What ConnectionPool needs from a pymysql connection."""
+
+    def __init__(self, n):
+        self.n = n
+        self.executed = []
+        self.fail_next = False
+        self.broken = False
+        self.closed = False
+        self.rollbacks = 0
+
+    def cursor(self):
+        return StandInCursor(self)
+
+    def ping(self, reconnect=True):
+        if self.broken:
+            raise RuntimeError("stand-in connection lost")
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        if self.broken:
+            raise RuntimeError("stand-in connection lost")
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+def check(condition, label):
+    print(f"{'ok  ' if condition else 'FAIL'} {label}")
+    return bool(condition)
+
+
+def check_stand_in():
+    results = []
+    for sql, expected in TRANSLATIONS:
+        results.append(check(translate(sql) == expected, f"translate: {' '.join(sql.split())[:70]}"))
+
+    opened = []
+    fail_open = []
+
+    def open_connection():
+        if fail_open:
+            fail_open.pop()
+            raise RuntimeError("stand-in server refused the connection")
+        opened.append(StandInConnection(len(opened)))
+        return opened[-1]
+
+    pool = ConnectionPool(open_connection, size=2, timeout=0.2)
+
+    def connect():
+        # MySQLBackend.connect() without pymysql
+        return MySQLConnection(pool, pool.acquire())
+
+    # Statements are translated and rows read by position and by name
+    conn = connect()
+    row = conn.execute("SELECT dept_id, dept_name FROM departments WHERE dept_id=?", [1]).fetchone()
+    results.append(check(opened[0].executed[-1] == ("SELECT dept_id, dept_name FROM departments WHERE dept_id=%s",
+                                                    (1,)), "statements reach the server translated"))
+    results.append(check(row[0] == 1 and row["dept_name"] == "CSE" and dict(zip(row.keys(), row)) ==
+                         {"dept_id": 1, "dept_name": "CSE"}, "rows index by position and by column name"))
+
+    # Pool exhaustion: the third connect waits pool_timeout, then gives up
+    second = connect()
+    started = time.perf_counter()
+    try:
+        connect()
+        timed_out = False
+    except PoolTimeout:
+        timed_out = True
+    waited = time.perf_counter() - started
+    results.append(check(timed_out and 0.15 <= waited < 1.0, f"PoolTimeout when all {pool.size} are in use "
+                                                            f"(waited {waited:.2f}s)"))
+
+    # A waiting connect gets the connection released meanwhile
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire()))
+    waiter.start()
+    second.close()
+    waiter.join()
+    results.append(check(got and got[0] is opened[1] and len(opened) == 2,
+                         "a waiting connect() gets the released connection"))
+    pool.release(got[0])
+
+    # Release on error: a failed statement still hands the connection back, rolled back
+    rollbacks = opened[0].rollbacks
+    opened[0].fail_next = True
+    try:
+        conn.execute("UPDATE departments SET dept_name=? WHERE dept_id=?", ("IT", 1))
+    except RuntimeError:
+        pass
+    finally:
+        conn.close()
+    conn.close()  # a second close() is a no-op
+    results.append(check(pool.in_use == 0 and opened[0].rollbacks == rollbacks + 1,
+                         "close() after a failed statement rolls back and frees the slot"))
+
+    # Release on error: a connection that broke is dropped and replaced
+    conn = connect()
+    conn._raw.broken = True
+    broken = conn._raw
+    conn.close()
+    fresh = [connect(), connect()]
+    results.append(check(broken.closed and broken not in [c._raw for c in fresh] and pool.in_use == 2,
+                         "a broken connection is closed on release and a fresh one opened"))
+    for c in fresh:
+        c.close()
+
+    # Release on error: a failed connect gives its slot back
+    fail_open.extend([True] * pool.size)
+    for c in [pool._idle.get_nowait() for _ in range(pool._idle.qsize())]:
+        c.close()
+    failures = 0
+    for _ in range(pool.size):
+        try:
+            connect()
+        except RuntimeError:
+            failures += 1
+    held = [connect(), connect()]
+    results.append(check(failures == pool.size and pool.in_use == 2,
+                         "failed connects free their slots"))
+    for c in held:
+        c.close()
+    pool.close()
+
+    print(f"{sum(results)}/{len(results)} stand-in checks passed")
+    return all(results)
+
+
+if __name__ == "__main__":
+    if "--stand-in" in sys.argv[1:]:
+        sys.exit(0 if check_stand_in() else 1)
+    check_configured()
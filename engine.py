@@ -0,0 +1,210 @@
+import random
+
+
+# =========================================================
+# PLACEMENT ENGINE
+# =========================================================
+# Period p of a day is bit (1 << p) in every mask below, so a slot check is
+# a couple of shifts and ANDs instead of a scan over the rows placed so far.
+
+def build_assignments(courses_list):
+    """
+    Expands course rows into one assignment per period to place.
+    Labs are a single double-period assignment, theory gets one per credit (default 3).
+    """
+    assignments = []
+    for course in courses_list:
+        if course["course_type"] == "lab":
+            assignments.append({
+                "course_id": course["course_id"],
+                "faculty_id": course["faculty_id"],
+                "course_type": "lab"
+            })
+        else:
+            slots = course["credits"] if course["credits"] else 3
+            for _ in range(slots):
+                assignments.append({
+                    "course_id": course["course_id"],
+                    "faculty_id": course["faculty_id"],
+                    "course_type": "theory"
+                })
+    return assignments
+
+
+class PlacementEngine:
+    def __init__(self, days, periods_per_day, break_after_periods=()):
+        self.days = list(days)
+        self.day_index = {day: i for i, day in enumerate(self.days)}
+        self.periods_per_day = periods_per_day
+        self.break_after_periods = set(break_after_periods)
+
+        # faculty_id -> [busy mask per day]
+        self.faculty_busy = {}
+        # (dept_id, semester) -> [taken mask per day]
+        self.class_taken = {}
+        # (dept_id, semester, day_idx) -> {course_id: mask of periods holding that course}
+        self.course_positions = {}
+
+        # Slot pools — period-first so courses spread across all days at morning periods
+        # Period 1 fills across all days first, then period 2, etc. Free slots fall at end of every day
+        n_days = len(self.days)
+        self.theory_slots = [(d, p) for p in range(1, periods_per_day + 1) for d in range(n_days)]
+        # Lab slots: exclude any pair (p, p+1) where a break falls between them
+        self.lab_slots = [
+            (d, p)
+            for p in range(1, periods_per_day)
+            for d in range(n_days)
+            if p not in self.break_after_periods
+        ]
+
+    # ---------------------------------------------------------
+    # State
+    # ---------------------------------------------------------
+    def _faculty_masks(self, faculty_id):
+        masks = self.faculty_busy.get(faculty_id)
+        if masks is None:
+            masks = self.faculty_busy[faculty_id] = [0] * len(self.days)
+        return masks
+
+    def _class_masks(self, dept_id, semester):
+        key = (dept_id, semester)
+        masks = self.class_taken.get(key)
+        if masks is None:
+            masks = self.class_taken[key] = [0] * len(self.days)
+        return masks
+
+    def _course_masks(self, dept_id, semester, d):
+        key = (dept_id, semester, d)
+        positions = self.course_positions.get(key)
+        if positions is None:
+            positions = self.course_positions[key] = {}
+        return positions
+
+    def mark_faculty_busy(self, faculty_id, day, period):
+        """Records an existing generated_timetable row that is not being regenerated."""
+        d = self.day_index.get(day)
+        if d is None or not 1 <= period <= self.periods_per_day:
+            return
+        self._faculty_masks(faculty_id)[d] |= 1 << period
+
+    def mark_placed(self, dept_id, semester, day, period, course_id, faculty_id):
+        """Records an existing generated_timetable row of a class that is being repaired in place."""
+        d = self.day_index.get(day)
+        if d is None or not 1 <= period <= self.periods_per_day:
+            return
+        self.apply(dept_id, semester, course_id, faculty_id, d, 1 << period)
+
+    # ---------------------------------------------------------
+    # Slot checks
+    # ---------------------------------------------------------
+    def can_place_theory(self, taken, busy, positions, course_id, d, p):
+        bit = 1 << p
+        if taken[d] & bit or busy[d] & bit:
+            return False
+        # No same course in adjacent periods (p-1 or p+1) on same day
+        return not positions.get(course_id, 0) & ((bit >> 1) | (bit << 1))
+
+    def can_place_lab(self, taken, busy, d, p):
+        pair = (1 << p) | (1 << (p + 1))
+        return not taken[d] & pair and not busy[d] & pair
+
+    def _commit(self, dept_id, semester, course_id, faculty_id, d, mask, taken, busy):
+        taken[d] |= mask
+        busy[d] |= mask
+        positions = self._course_masks(dept_id, semester, d)
+        positions[course_id] = positions.get(course_id, 0) | mask
+
+    def lab_domain(self, dept_id, semester, faculty_id):
+        """Indexes into lab_slots that are still free for this class and faculty."""
+        taken = self._class_masks(dept_id, semester)
+        busy = self._faculty_masks(faculty_id)
+        return [i for i, (d, p) in enumerate(self.lab_slots) if self.can_place_lab(taken, busy, d, p)]
+
+    def theory_domain(self, dept_id, semester, course_id, faculty_id, start=0):
+        """Indexes into theory_slots (from start onwards) that are still free for this course."""
+        taken = self._class_masks(dept_id, semester)
+        busy = self._faculty_masks(faculty_id)
+        slots = self.theory_slots
+        result = []
+        for i in range(start, len(slots)):
+            d, p = slots[i]
+            positions = self.course_positions.get((dept_id, semester, d), {})
+            if self.can_place_theory(taken, busy, positions, course_id, d, p):
+                result.append(i)
+        return result
+
+    def apply(self, dept_id, semester, course_id, faculty_id, d, mask):
+        self._commit(dept_id, semester, course_id, faculty_id, d, mask,
+                     self._class_masks(dept_id, semester), self._faculty_masks(faculty_id))
+
+    def undo(self, dept_id, semester, course_id, faculty_id, d, mask):
+        self._class_masks(dept_id, semester)[d] &= ~mask
+        self._faculty_masks(faculty_id)[d] &= ~mask
+        positions = self._course_masks(dept_id, semester, d)
+        positions[course_id] = positions.get(course_id, 0) & ~mask
+
+    # ---------------------------------------------------------
+    # Placement
+    # ---------------------------------------------------------
+    def place_assignment(self, dept_id, semester, assignment):
+        """
+        First-fit placement of one assignment over the slot pools.
+        Returns the generated_timetable rows it produced (empty if no slot fit).
+        """
+        course_id = assignment["course_id"]
+        faculty_id = assignment["faculty_id"]
+        taken = self._class_masks(dept_id, semester)
+        busy = self._faculty_masks(faculty_id)
+        days = self.days
+
+        if assignment["course_type"] == "lab":
+            for (d, p) in self.lab_slots:
+                if self.can_place_lab(taken, busy, d, p):
+                    self._commit(dept_id, semester, course_id, faculty_id, d,
+                                 (1 << p) | (1 << (p + 1)), taken, busy)
+                    return [(dept_id, semester, days[d], p, course_id, faculty_id),
+                            (dept_id, semester, days[d], p + 1, course_id, faculty_id)]
+            return []
+
+        for (d, p) in self.theory_slots:
+            positions = self.course_positions.get((dept_id, semester, d), {})
+            if self.can_place_theory(taken, busy, positions, course_id, d, p):
+                self._commit(dept_id, semester, course_id, faculty_id, d, 1 << p, taken, busy)
+                return [(dept_id, semester, days[d], p, course_id, faculty_id)]
+        return []
+
+    def place_class(self, dept_id, semester, courses_list, rng=random):
+        """
+        Places every course of one dept+semester.
+        Returns (rows, unplaced_assignments).
+        """
+        assignments = build_assignments(courses_list)
+        rng.shuffle(assignments)
+
+        rows = []
+        unplaced = []
+        for assignment in assignments:
+            placed = self.place_assignment(dept_id, semester, assignment)
+            if placed:
+                rows.extend(placed)
+            else:
+                unplaced.append(assignment)
+        return rows, unplaced
+
+
+def summarize_unplaced(dept_id, semester, assignments):
+    """Collapses unplaced assignments into one report entry per course."""
+    by_course = {}
+    for a in assignments:
+        entry = by_course.get(a["course_id"])
+        if entry is None:
+            entry = by_course[a["course_id"]] = {
+                "dept_id": dept_id,
+                "semester": semester,
+                "course_id": a["course_id"],
+                "faculty_id": a["faculty_id"],
+                "course_type": a["course_type"],
+                "periods": 0
+            }
+        entry["periods"] += 2 if a["course_type"] == "lab" else 1
+    return list(by_course.values())
@@ -0,0 +1,126 @@
+import csv
+import io
+from datetime import date, datetime, timedelta, timezone
+
+
+# =========================================================
+# STREAMING EXPORTS
+# =========================================================
+# Generators that read generated_timetable in fixed-size batches and yield
+# text chunks, so an institution-wide export runs in constant memory behind a
+# streamed Flask response.
+
+BATCH_SIZE = 500
+
+WEEKDAYS = {"Mon": 0, "Tue": 1, "Wed": 2, "Thu": 3, "Fri": 4, "Sat": 5, "Sun": 6}
+ICAL_DAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+EXPORT_SELECT = """
+    SELECT gt.dept_id, d.dept_name, gt.semester, gt.day, gt.period,
+           c.course_code, c.course_name, c.course_type, gt.faculty_id, f.faculty_name
+    FROM generated_timetable gt
+    JOIN courses c ON gt.course_id = c.course_id
+    JOIN faculties f ON gt.faculty_id = f.faculty_id
+    JOIN departments d ON gt.dept_id = d.dept_id
+"""
+
+
+def day_order(settings):
+    """
+    ORDER BY terms (sql, params) putting gt.day in the configured working-day
+    order (Mon..Sun without settings); days outside it sort last, by name.
+    """
+    days = list(settings.days) if settings else list(WEEKDAYS)
+    if not days:
+        return "gt.day", []
+    return f"CASE gt.day {' '.join(f'WHEN ? THEN {i}' for i in range(len(days)))} ELSE {len(days)} END, gt.day", days
+
+
+def iter_batches(conn, sql, params=()):
+    cur = conn.cursor()
+    cur.execute(sql, params)
+    while True:
+        rows = cur.fetchmany(BATCH_SIZE)
+        if not rows:
+            break
+        yield rows
+
+
+def csv_stream(conn, settings):
+    """Yields the whole institution's timetable as CSV, one chunk per batch."""
+    period_times = settings.period_times if settings else {}
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(["dept_id", "dept_name", "semester", "day", "period", "time",
+                     "course_code", "course_name", "course_type", "faculty_id", "faculty_name"])
+    order, order_params = day_order(settings)
+    sql = EXPORT_SELECT + f" ORDER BY gt.dept_id, gt.semester, {order}, gt.period"
+    for rows in iter_batches(conn, sql, order_params):
+        for row in rows:
+            writer.writerow([row["dept_id"], row["dept_name"], row["semester"], row["day"], row["period"],
+                             period_times.get(row["period"], ""), row["course_code"], row["course_name"],
+                             row["course_type"], row["faculty_id"], row["faculty_name"]])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _ical_text(value):
+    return (str(value if value is not None else "")
+            .replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n"))
+
+
+def _ical_lines(*lines):
+    # Content lines longer than 75 octets are folded onto continuation lines
+    out = []
+    for line in lines:
+        while len(line.encode("utf-8")) > 75:
+            cut = 75
+            while len(line[:cut].encode("utf-8")) > 75:
+                cut -= 1
+            out.append(line[:cut])
+            line = " " + line[cut:]
+        out.append(line)
+    return "".join(l + "\r\n" for l in out)
+
+
+def ics_stream(conn, settings, where, params, calendar_name, uid_prefix):
+    """
+    Yields an iCalendar file with one weekly recurring event per timetable slot
+    matching `where` (an SQL condition on generated_timetable aliased gt).
+    """
+    period_times = settings.period_times if settings else {}
+    week_start = date.today() - timedelta(days=date.today().weekday())
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    yield _ical_lines("BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//TimeTable Pro//Timetable Export//EN",
+                      "CALSCALE:GREGORIAN", "X-WR-CALNAME:" + _ical_text(calendar_name))
+
+    order, order_params = day_order(settings)
+    sql = EXPORT_SELECT + " WHERE " + where + f" ORDER BY {order}, gt.period"
+    for rows in iter_batches(conn, sql, list(params) + order_params):
+        chunk = []
+        for row in rows:
+            weekday = WEEKDAYS.get(row["day"])
+            times = period_times.get(row["period"])
+            if weekday is None or not times:
+                continue
+            start, end = [t.strip().replace(":", "") for t in times.split("-")]
+            day = (week_start + timedelta(days=weekday)).strftime("%Y%m%d")
+            chunk.append(_ical_lines(
+                "BEGIN:VEVENT",
+                f"UID:{uid_prefix}-{row['dept_id']}-{row['semester']}-{row['day']}-{row['period']}@timetable",
+                "DTSTAMP:" + stamp,
+                f"DTSTART:{day}T{start}00",
+                f"DTEND:{day}T{end}00",
+                "RRULE:FREQ=WEEKLY;BYDAY=" + ICAL_DAYS[weekday],
+                "SUMMARY:" + _ical_text(f"{row['course_code']} {row['course_name']}"),
+                "DESCRIPTION:" + _ical_text(f"{row['course_type'].title()} - {row['faculty_name']}, "
+                                            f"{row['dept_name']} semester {row['semester']}"),
+                "END:VEVENT"))
+        yield "".join(chunk)
+
+    yield _ical_lines("END:VCALENDAR")
@@ -0,0 +1,215 @@
+import json
+
+
+# =========================================================
+# TIMETABLE HISTORY
+# =========================================================
+# Every write to generated_timetable records a version. The version is one
+# timetable_versions row. For each class cell (dept_id, semester, day, period)
+# whose entries changed, timetable_cell_changes also gets the cell's new
+# entries; course_id is NULL when the cell was emptied. Cells are numbered once
+# in timetable_history_cells, so a change row is four integers and unchanged
+# cells cost nothing.
+#
+# A cell's value at version v is its last change at or before v, which is one
+# seek on (cell_id, version_id). Rebuilding a timetable or diffing two versions
+# therefore costs per cell, however many versions are stored.
+
+CHUNK = 500  # stays under SQLite's bound-parameter limit
+EMPTY = frozenset()
+
+
+def _marks(values):
+    return ",".join("?" * len(values))
+
+
+def _chunks(values):
+    values = list(values)
+    for i in range(0, len(values), CHUNK):
+        yield values[i:i + CHUNK]
+
+
+def live_cells(conn, dept_ids, stage_id=None):
+    """
+    {(dept_id, semester, day, period): frozenset of (course_id, faculty_id)} from
+    generated_timetable, or from the staged rows that will replace it (publish.py).
+    """
+    cells = {}
+    source, params = "generated_timetable", []
+    if stage_id is not None:
+        source, params = "generated_timetable_staging", [stage_id]
+    for chunk in _chunks(dept_ids):
+        for row in conn.execute(f"""
+            SELECT dept_id, semester, day, period, course_id, faculty_id
+            FROM {source} WHERE {"stage_id=? AND " if stage_id is not None else ""}dept_id IN ({_marks(chunk)})
+        """, params + chunk).fetchall():
+            cells.setdefault(tuple(row[:4]), set()).add((row[4], row[5]))
+    return {key: frozenset(entries) for key, entries in cells.items()}
+
+
+def _values_at(conn, cell_where, params, version=None):
+    """{cell_id: (cell key, entries)} for the cells matching cell_where, as of version (default: latest)."""
+    at = " AND m.version_id <= ?" if version is not None else ""
+    rows = conn.execute(f"""
+        SELECT h.cell_id, h.dept_id, h.semester, h.day, h.period, c.course_id, c.faculty_id
+        FROM timetable_history_cells h
+        JOIN timetable_cell_changes c ON c.cell_id = h.cell_id AND c.version_id = (
+            SELECT MAX(m.version_id) FROM timetable_cell_changes m WHERE m.cell_id = h.cell_id{at})
+        WHERE {cell_where}
+    """, ([version] if version is not None else []) + list(params)).fetchall()
+    values = {}
+    for row in rows:
+        key, entries = values.setdefault(row[0], (tuple(row[1:5]), set()))
+        if row[5] is not None:
+            entries.add((row[5], row[6]))
+    return {cell_id: (key, frozenset(entries)) for cell_id, (key, entries) in values.items()}
+
+
+def _cell_ids(conn, keys):
+    """{cell key: cell_id}, numbering cells seen for the first time."""
+    keys = list(keys)
+    dept_ids = sorted({key[0] for key in keys})
+    ids = {}
+
+    def load():
+        for chunk in _chunks(dept_ids):
+            for row in conn.execute(f"""
+                SELECT cell_id, dept_id, semester, day, period FROM timetable_history_cells
+                WHERE dept_id IN ({_marks(chunk)})
+            """, chunk).fetchall():
+                ids[tuple(row[1:])] = row[0]
+
+    load()
+    missing = [key for key in keys if key not in ids]
+    if missing:
+        conn.executemany("INSERT INTO timetable_history_cells (dept_id, semester, day, period) VALUES (?, ?, ?, ?)",
+                         missing)
+        load()
+    return ids
+
+
+def changed_cells(conn, dept_ids, live):
+    """{cell key: entries} of the cells of dept_ids whose live entries differ from the latest recorded ones."""
+    head = {}
+    for chunk in _chunks(dept_ids):
+        head.update(_values_at(conn, f"h.dept_id IN ({_marks(chunk)})", chunk).values())
+    return {key: live.get(key, EMPTY) for key in head.keys() | live.keys()
+            if live.get(key, EMPTY) != head.get(key, EMPTY)}
+
+
+def record_version(conn, source, dept_ids):
+    """
+    Records the current generated_timetable rows of dept_ids as a new version,
+    storing only the cells that differ from the latest recorded ones. Part of
+    the caller's transaction — the caller commits. Returns the version id.
+    """
+    dept_ids = sorted(set(dept_ids))
+    if not dept_ids:
+        return None
+    return write_version(conn, source, dept_ids, changed_cells(conn, dept_ids, live_cells(conn, dept_ids)))
+
+
+def write_version(conn, source, dept_ids, changed):
+    """Writes a version of dept_ids with the changed_cells() computed for it. Returns the version id."""
+    dept_ids = sorted(set(dept_ids))
+    cur = conn.cursor()
+    cur.execute("INSERT INTO timetable_versions (source, dept_ids, changed_cells) VALUES (?, ?, ?)",
+                (source, json.dumps(dept_ids), len(changed)))
+    version_id = cur.lastrowid
+    if changed:
+        ids = _cell_ids(conn, changed)
+        rows = []
+        for key, entries in changed.items():
+            for course_id, faculty_id in sorted(entries, key=lambda e: (e[0] or 0, e[1] or 0)) or [(None, None)]:
+                rows.append((version_id, ids[key], course_id, faculty_id))
+        conn.executemany("""
+            INSERT INTO timetable_cell_changes (version_id, cell_id, course_id, faculty_id) VALUES (?, ?, ?, ?)
+        """, rows)
+    return version_id
+
+
+# =========================================================
+# READING HISTORY
+# =========================================================
+def latest_version(conn):
+    row = conn.execute("SELECT MAX(version_id) FROM timetable_versions").fetchone()
+    return row[0] or 0
+
+
+def version_exists(conn, version_id):
+    """Version 0 is the empty timetable before the first recorded one."""
+    return version_id == 0 or conn.execute("SELECT 1 FROM timetable_versions WHERE version_id=?",
+                                           (version_id,)).fetchone() is not None
+
+
+def list_versions(conn, limit=50, before=None):
+    """Newest first; pass the last version_id of a page as `before` for the next one."""
+    sql = "SELECT version_id, created_at, source, dept_ids, changed_cells FROM timetable_versions"
+    params = []
+    if before is not None:
+        sql += " WHERE version_id < ?"
+        params.append(before)
+    sql += " ORDER BY version_id DESC LIMIT ?"
+    params.append(limit)
+    return [{
+        "version_id": row["version_id"],
+        "created_at": str(row["created_at"]),
+        "source": row["source"],
+        "dept_ids": json.loads(row["dept_ids"]),
+        "changed_cells": row["changed_cells"],
+    } for row in conn.execute(sql, params).fetchall()]
+
+
+def diff_versions(conn, from_version, to_version, dept_id=None, semester=None, days=()):
+    """
+    Cells whose entries differ between two versions (either order), as
+    [{"dept_id", "semester", "day", "period", "before": [...], "after": [...]}]
+    where before/after list {"course_id", "faculty_id"}. days orders the result.
+    """
+    lo, hi = sorted((from_version, to_version))
+    where, params = "1=1", []
+    if dept_id is not None:
+        where += " AND h.dept_id=?"
+        params.append(dept_id)
+    if semester is not None:
+        where += " AND h.semester=?"
+        params.append(semester)
+
+    # Few changes between the versions: their change rows name the cells to compare.
+    # Many: compare every cell, which is bounded by the timetable's size instead.
+    range_changes = conn.execute("""
+        SELECT COALESCE(SUM(changed_cells), 0) FROM timetable_versions WHERE version_id > ? AND version_id <= ?
+    """, (lo, hi)).fetchone()[0]
+    cell_count = conn.execute(f"SELECT COUNT(*) FROM timetable_history_cells h WHERE {where}", params).fetchone()[0]
+    if lo == hi:
+        older = newer = {}
+    elif range_changes < cell_count:
+        candidates = [row[0] for row in conn.execute(f"""
+            SELECT DISTINCT c.cell_id FROM timetable_cell_changes c
+            JOIN timetable_history_cells h ON h.cell_id = c.cell_id
+            WHERE c.version_id > ? AND c.version_id <= ? AND {where}
+        """, [lo, hi] + params).fetchall()]
+        older, newer = {}, {}
+        for chunk in _chunks(candidates):
+            older.update(_values_at(conn, f"h.cell_id IN ({_marks(chunk)})", chunk, lo))
+            newer.update(_values_at(conn, f"h.cell_id IN ({_marks(chunk)})", chunk, hi))
+    else:
+        older = _values_at(conn, where, params, lo)
+        newer = _values_at(conn, where, params, hi)
+    before, after = (older, newer) if from_version <= to_version else (newer, older)
+
+    day_order = {day: i for i, day in enumerate(days)}
+    changes = []
+    for cell_id in before.keys() | after.keys():
+        key, old = before.get(cell_id, (None, EMPTY))
+        key, new = after.get(cell_id, (key, EMPTY))
+        if old == new:
+            continue
+        changes.append({
+            "dept_id": key[0], "semester": key[1], "day": key[2], "period": key[3],
+            "before": [{"course_id": c, "faculty_id": f} for c, f in sorted(old)],
+            "after": [{"course_id": c, "faculty_id": f} for c, f in sorted(new)],
+        })
+    changes.sort(key=lambda c: (c["dept_id"], c["semester"], day_order.get(c["day"], len(day_order)), c["day"],
+                                c["period"]))
+    return changes
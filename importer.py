@@ -0,0 +1,182 @@
+import csv
+import io
+import json
+
+from database import last_sequence_value
+
+
+# =========================================================
+# BULK IMPORT
+# =========================================================
+# Departments, faculties and courses from CSV or JSON. Every row is checked in
+# memory against the existing tables and the rest of the batch, then the valid
+# rows are written with one executemany per table inside a single transaction.
+# Invalid rows are skipped and reported with their row number.
+
+ENTITIES = ("departments", "faculties", "courses")
+COURSE_TYPES = ("theory", "lab")
+
+
+def parse_records(text, fmt, entity=None):
+    """
+    Returns {entity: [record, ...]}.
+    CSV holds one entity (named by `entity`); JSON is either a list for `entity`
+    or an object keyed by entity name.
+    """
+    if fmt == "csv":
+        if entity not in ENTITIES:
+            raise ValueError(f"CSV imports need an entity: one of {', '.join(ENTITIES)}.")
+        return {entity: list(csv.DictReader(io.StringIO(text)))}
+
+    if fmt == "json":
+        data = json.loads(text)
+        if isinstance(data, list):
+            if entity not in ENTITIES:
+                raise ValueError(f"A JSON list needs an entity: one of {', '.join(ENTITIES)}.")
+            return {entity: data}
+        if isinstance(data, dict):
+            unknown = set(data) - set(ENTITIES)
+            if unknown:
+                raise ValueError(f"Unknown entities: {', '.join(sorted(unknown))}.")
+            return {name: data[name] for name in ENTITIES if name in data}
+        raise ValueError("JSON must be a list of records or an object keyed by entity.")
+
+    raise ValueError(f"Unsupported format '{fmt}'. Use csv or json.")
+
+
+def _check(record):
+    if not isinstance(record, dict):
+        raise ValueError("record must be an object of field: value pairs")
+
+
+def _text(record, field):
+    value = record.get(field)
+    value = str(value).strip() if value is not None else ""
+    if not value:
+        raise ValueError(f"{field} is required")
+    return value
+
+
+def _int(record, field, required=True):
+    value = record.get(field)
+    if value is None or str(value).strip() == "":
+        if required:
+            raise ValueError(f"{field} is required")
+        return None
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        raise ValueError(f"{field} must be a whole number, got '{value}'")
+
+
+def entity_errors(data):
+    """Errors (with row None) for every entity in data whose value is not a list of records."""
+    return [{"entity": name, "row": None, "error": "must be a list of records"}
+            for name in ENTITIES if name in data and not isinstance(data[name], list)]
+
+
+def import_records(conn, data, dry_run=False):
+    """
+    Validates and inserts data = {entity: [record, ...]}.
+    Faculties may carry an explicit faculty_id; courses reference a faculty by
+    faculty_id or by faculty_name within the course's department.
+    Returns {"inserted": {entity: count}, "errors": [{"entity", "row", "error"}, ...]}.
+    If any entity is not a list (see entity_errors) nothing is imported.
+    """
+    cur = conn.cursor()
+    errors = entity_errors(data)
+    if errors:
+        nothing = {name: 0 for name in ENTITIES}
+        report = {"inserted": nothing, "errors": errors}
+        if dry_run:
+            report["valid"] = dict(nothing)
+        return report
+
+    dept_ids = {row[0] for row in cur.execute("SELECT dept_id FROM departments").fetchall()}
+    faculty_depts = {}      # faculty_id -> dept_id
+    faculty_by_name = {}    # (dept_id, faculty_name) -> faculty_id
+    for row in cur.execute("SELECT faculty_id, faculty_name, dept_id FROM faculties").fetchall():
+        faculty_depts[row[0]] = row[2]
+        faculty_by_name[(row[2], row[1])] = row[0]
+
+    # New faculties get ids up front so courses in the same batch can point at them
+    next_faculty_id = max([last_sequence_value(conn, "faculties")] + list(faculty_depts)) + 1
+
+    new_departments, new_faculties, new_courses = [], [], []
+
+    for n, record in enumerate(data.get("departments", []), start=1):
+        try:
+            _check(record)
+            dept_id = _int(record, "dept_id")
+            dept_name = _text(record, "dept_name")
+            if dept_id in dept_ids:
+                raise ValueError(f"dept_id {dept_id} already exists")
+        except ValueError as e:
+            errors.append({"entity": "departments", "row": n, "error": str(e)})
+            continue
+        dept_ids.add(dept_id)
+        new_departments.append((dept_id, dept_name))
+
+    for n, record in enumerate(data.get("faculties", []), start=1):
+        try:
+            _check(record)
+            faculty_name = _text(record, "faculty_name")
+            dept_id = _int(record, "dept_id")
+            faculty_id = _int(record, "faculty_id", required=False)
+            if dept_id not in dept_ids:
+                raise ValueError(f"dept_id {dept_id} does not exist")
+            if faculty_id is not None and faculty_id in faculty_depts:
+                raise ValueError(f"faculty_id {faculty_id} already exists")
+        except ValueError as e:
+            errors.append({"entity": "faculties", "row": n, "error": str(e)})
+            continue
+        if faculty_id is None:
+            faculty_id = next_faculty_id
+        next_faculty_id = max(next_faculty_id, faculty_id + 1)
+        faculty_depts[faculty_id] = dept_id
+        faculty_by_name[(dept_id, faculty_name)] = faculty_id
+        new_faculties.append((faculty_id, faculty_name, dept_id))
+
+    for n, record in enumerate(data.get("courses", []), start=1):
+        try:
+            _check(record)
+            course_name = _text(record, "course_name")
+            course_code = _text(record, "course_code")
+            semester = _int(record, "semester")
+            credits = _int(record, "credits")
+            dept_id = _int(record, "dept_id")
+            course_type = str(record.get("course_type") or "theory").strip().lower()
+            if dept_id not in dept_ids:
+                raise ValueError(f"dept_id {dept_id} does not exist")
+            if course_type not in COURSE_TYPES:
+                raise ValueError(f"course_type must be theory or lab, got '{course_type}'")
+            faculty_id = _int(record, "faculty_id", required=False)
+            if faculty_id is None:
+                faculty_name = _text(record, "faculty_name")
+                faculty_id = faculty_by_name.get((dept_id, faculty_name))
+                if faculty_id is None:
+                    raise ValueError(f"no faculty named '{faculty_name}' in dept_id {dept_id}")
+            elif faculty_id not in faculty_depts:
+                raise ValueError(f"faculty_id {faculty_id} does not exist")
+        except ValueError as e:
+            errors.append({"entity": "courses", "row": n, "error": str(e)})
+            continue
+        new_courses.append((course_name, course_code, semester, credits, faculty_id, dept_id, course_type))
+
+    inserted = {"departments": len(new_departments), "faculties": len(new_faculties),
+                "courses": len(new_courses)}
+    if dry_run:
+        return {"inserted": {name: 0 for name in inserted}, "valid": inserted, "errors": errors}
+
+    try:
+        cur.executemany("INSERT INTO departments (dept_id, dept_name) VALUES (?, ?)", new_departments)
+        cur.executemany("INSERT INTO faculties (faculty_id, faculty_name, dept_id) VALUES (?, ?, ?)",
+                        new_faculties)
+        cur.executemany("""
+            INSERT INTO courses (course_name, course_code, semester, credits, faculty_id, dept_id, course_type)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, new_courses)
+    except Exception:
+        conn.rollback()
+        raise
+    return {"inserted": inserted, "errors": errors}
@@ -0,0 +1,131 @@
+import itertools
+import queue
+import threading
+import time
+
+
+# =========================================================
+# BACKGROUND GENERATION JOBS
+# =========================================================
+# Generation requests are queued and run one at a time on a worker thread of
+# this process; the HTTP handlers only submit jobs and read their state.
+
+MAX_KEPT_JOBS = 50
+
+
+class GenerationJob:
+    def __init__(self, job_id, dept_ids, options):
+        self.id = job_id
+        self.dept_ids = list(dept_ids)
+        self.options = dict(options)
+        self.state = "queued"  # queued -> running -> done / failed
+        self.message = None
+        self.report = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        # dept_id -> {"classes": planned (dept, semester) count, "placed": placed so far}
+        self.progress = {dept_id: {"classes": 0, "placed": 0} for dept_id in self.dept_ids}
+        self.stage = None
+
+        self.version = 0
+        self._changed = threading.Condition()
+
+    def _touch(self):
+        with self._changed:
+            self.version += 1
+            self._changed.notify_all()
+
+    def on_progress(self, event, dept_id=None, semester=None, classes=None):
+        """Progress callback handed to generate_timetable_logic."""
+        # Under the condition's lock: request threads copy progress in to_dict()
+        with self._changed:
+            if event == "planned":
+                # A generation that has to re-plan starts its counts over
+                self.progress = {}
+                for d, _ in classes:
+                    self.progress.setdefault(d, {"classes": 0, "placed": 0})["classes"] += 1
+            elif event == "placed":
+                self.progress.setdefault(dept_id, {"classes": 0, "placed": 0})["placed"] += 1
+            self.stage = event
+        self._touch()
+
+    def wait_for_change(self, seen_version, timeout):
+        """Blocks until the job changes past seen_version or timeout; returns the current version."""
+        with self._changed:
+            if self.version == seen_version and self.state not in ("done", "failed"):
+                self._changed.wait(timeout)
+            return self.version
+
+    @property
+    def finished(self):
+        return self.state in ("done", "failed")
+
+    def to_dict(self):
+        end = self.finished_at or time.time()
+        report = self.report or {}
+        with self._changed:
+            progress = {str(k): dict(v) for k, v in self.progress.items()}
+        return {
+            "id": self.id,
+            "state": self.state,
+            "stage": self.stage,
+            "dept_ids": self.dept_ids,
+            "options": self.options,
+            "progress": progress,
+            "elapsed": round(end - self.started_at, 3) if self.started_at else 0.0,
+            "message": self.message,
+            "placed_periods": report.get("placed_periods"),
+            "unplaced_periods": report.get("unplaced_periods"),
+            "report": self.report
+        }
+
+
+class JobQueue:
+    """
+    In-process generation queue. run_job(job) does the work and returns
+    (success, message, report) like generate_timetable_logic.
+    """
+
+    def __init__(self, run_job):
+        self.run_job = run_job
+        self.jobs = {}
+        self._ids = itertools.count(1)
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def submit(self, dept_ids, **options):
+        with self._lock:
+            job = GenerationJob(next(self._ids), dept_ids, options)
+            self.jobs[job.id] = job
+            # Forget the oldest finished jobs once the history is full
+            finished = [j for j in self.jobs.values() if j.finished]
+            for old in finished[:max(0, len(self.jobs) - MAX_KEPT_JOBS)]:
+                del self.jobs[old.id]
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._work, name="generation-worker", daemon=True)
+                self._worker.start()
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            job.state = "running"
+            job.started_at = time.time()
+            job._touch()
+            try:
+                success, message, report = self.run_job(job)
+                job.state = "done" if success else "failed"
+                job.message = message
+                job.report = report
+            except Exception as e:
+                job.state = "failed"
+                job.message = f"Generation failed: {e}"
+            job.finished_at = time.time()
+            job._touch()
+            self._queue.task_done()
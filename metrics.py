@@ -0,0 +1,188 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+
+# =========================================================
+# METRICS
+# =========================================================
+# In-process counters and histograms rendered in the Prometheus text format.
+# Each worker process keeps its own numbers; scrape every worker (or sum
+# them) when running more than one.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1, 0.5)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+PHASE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _label_text(names, values):
+    if not names:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in values)
+    return ",".join(f'{n}="{v}"' for n, v in zip(names, escaped))
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[n] for n in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            labels = _label_text(self.labels, key)
+            lines.append(f"{self.name}{{{labels}}} {value}" if labels else f"{self.name} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.labels = tuple(labels)
+        self._series = {}   # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[n] for n in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        for key, series in items:
+            labels = _label_text(self.labels, key)
+            prefix = labels + "," if labels else ""
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {series[-1]}')
+            suffix = f"{{{labels}}}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{suffix} {series[-1]}")
+        return lines
+
+
+requests_total = Counter("timetable_http_requests_total", "HTTP requests by route, method and status.",
+                         ("route", "method", "status"))
+request_duration = Histogram("timetable_http_request_duration_seconds", "Time to build a response.",
+                             LATENCY_BUCKETS, ("route", "method"))
+request_queries = Histogram("timetable_http_request_sql_queries", "SQL statements executed per request.",
+                            COUNT_BUCKETS, ("route",))
+request_sql_time = Histogram("timetable_http_request_sql_seconds", "Time spent in SQL per request.",
+                             LATENCY_BUCKETS, ("route",))
+sql_duration = Histogram("timetable_sql_statement_duration_seconds", "SQL statement execution time.",
+                         SQL_BUCKETS, ("statement",))
+generation_phase = Histogram("timetable_generation_phase_seconds", "Time per timetable generation phase.",
+                             PHASE_BUCKETS, ("phase",))
+
+REGISTRY = (requests_total, request_duration, request_queries, request_sql_time, sql_duration, generation_phase)
+
+
+def render_metrics():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def observe_request(route, method, status, seconds, queries, sql_seconds):
+    requests_total.inc(route=route, method=method, status=status)
+    request_duration.observe(seconds, route=route, method=method)
+    request_queries.observe(queries, route=route)
+    request_sql_time.observe(sql_seconds, route=route)
+
+
+# =========================================================
+# INSTRUMENTED SQLITE CONNECTIONS
+# =========================================================
+def _statement(sql):
+    # First keyword only, so the label set stays small
+    word = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+    return word if word in ("SELECT", "INSERT", "UPDATE", "DELETE", "PRAGMA", "WITH") else "OTHER"
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=()):
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self.connection.record_query(sql, time.perf_counter() - started)
+
+    def executemany(self, sql, seq_of_parameters):
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self.connection.record_query(sql, time.perf_counter() - started)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """sqlite3 connection factory that counts and times every statement it runs."""
+
+    dialect = "sqlite"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reset_query_stats()
+
+    def reset_query_stats(self):
+        self.query_count = 0
+        self.query_seconds = 0.0
+
+    def record_query(self, sql, seconds):
+        self.query_count += 1
+        self.query_seconds += seconds
+        sql_duration.observe(seconds, statement=_statement(sql))
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    # sqlite3.Connection.execute* bypass cursor(), so route them through it
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+# =========================================================
+# GENERATION PHASES
+# =========================================================
+class PhaseTimer:
+    """Times named phases into generation_phase and keeps them for the generation report."""
+
+    def __init__(self):
+        self.seconds = {}
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.seconds[name] = round(self.seconds.get(name, 0) + elapsed, 4)
+            generation_phase.observe(elapsed, phase=name)
@@ -0,0 +1,391 @@
+import json
+
+from database import table_columns
+
+
+# =========================================================
+# SCHEMA MIGRATIONS
+# =========================================================
+# Each migration runs once, in order, inside its own transaction and is then
+# recorded in schema_version. Run them once per deploy with `flask migrate`
+# (or `python app.py` in development) — never at import time.
+#
+# A migration that backfills data does it with its own SQL and helpers below,
+# not through snapshots.py, history.py or workload.py: those follow the current
+# schema, while a migration has to do the same thing whenever it runs.
+
+
+def _base_schema(cur):
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS departments(
+        dept_id INTEGER PRIMARY KEY,
+        dept_name VARCHAR(255) NOT NULL
+    )""")
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS faculties(
+        faculty_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        faculty_name VARCHAR(255) NOT NULL,
+        dept_id INTEGER,
+        FOREIGN KEY(dept_id) REFERENCES departments(dept_id)
+    )""")
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS courses(
+        course_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        course_name VARCHAR(255),
+        course_code VARCHAR(64),
+        semester INTEGER,
+        credits INTEGER,
+        faculty_id INTEGER,
+        dept_id INTEGER,
+        course_type VARCHAR(16) NOT NULL DEFAULT 'theory',
+        FOREIGN KEY(faculty_id) REFERENCES faculties(faculty_id),
+        FOREIGN KEY(dept_id) REFERENCES departments(dept_id)
+    )""")
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS timetable_settings(
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        periods_per_day INTEGER,
+        period_duration INTEGER,
+        number_of_breaks INTEGER,
+        break_details TEXT,
+        working_days VARCHAR(64) DEFAULT 'Mon,Tue,Wed,Thu,Fri,Sat',
+        start_time VARCHAR(8) DEFAULT '09:00'
+    )""")
+
+    # Databases created before these columns existed
+    columns = table_columns(cur.connection, "timetable_settings")
+    for col, col_type, default in [("working_days", "VARCHAR(64)", "'Mon,Tue,Wed,Thu,Fri,Sat'"),
+                                   ("start_time", "VARCHAR(8)", "'09:00'")]:
+        if col not in columns:
+            cur.execute(f"ALTER TABLE timetable_settings ADD COLUMN {col} {col_type} DEFAULT {default}")
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS generated_timetable(
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        dept_id INTEGER,
+        semester INTEGER,
+        day VARCHAR(16),
+        period INTEGER,
+        course_id INTEGER,
+        faculty_id INTEGER,
+        FOREIGN KEY(dept_id) REFERENCES departments(dept_id),
+        FOREIGN KEY(course_id) REFERENCES courses(course_id),
+        FOREIGN KEY(faculty_id) REFERENCES faculties(faculty_id)
+    )""")
+
+
+def _hot_path_indexes(cur):
+    # Trailing columns make each index covering for the query that uses it,
+    # so the lookups never have to visit the table rows.
+    # /student grid and the generate preview
+    cur.execute("""
+    CREATE INDEX IF NOT EXISTS idx_generated_timetable_dept_sem
+    ON generated_timetable(dept_id, semester, day, period, course_id, faculty_id)""")
+    # /faculty grid and faculty clash lookups
+    cur.execute("""
+    CREATE INDEX IF NOT EXISTS idx_generated_timetable_faculty
+    ON generated_timetable(faculty_id, day, period, dept_id, semester, course_id)""")
+    # Generator's per dept+semester course loads
+    cur.execute("""
+    CREATE INDEX IF NOT EXISTS idx_courses_dept_sem
+    ON courses(dept_id, semester, course_id, credits, faculty_id, course_type)""")
+
+
+def _data_versions(cur):
+    # One change counter per cached dataset, see cache.py
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS data_versions(
+        name VARCHAR(64) PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    )""")
+
+
+def _timetable_snapshots(cur):
+    # Serialized class/faculty grids, see snapshots.py
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS timetable_snapshots(
+        kind VARCHAR(16) NOT NULL,
+        snapshot_key VARCHAR(64) NOT NULL,
+        payload TEXT NOT NULL,
+        PRIMARY KEY(kind, snapshot_key)
+    )""")
+    # Backfill from whatever is already generated
+    _backfill_snapshots(cur)
+
+
+def _backfill_snapshots(cur):
+    """Class and faculty snapshot payloads as migration 4 defined them."""
+    classes = {}
+    for row in cur.execute("""
+        SELECT gt.dept_id, gt.semester, gt.day, gt.period,
+               c.course_name, c.course_code, c.course_type, f.faculty_name
+        FROM generated_timetable gt
+        JOIN courses c ON gt.course_id = c.course_id
+        JOIN faculties f ON gt.faculty_id = f.faculty_id
+    """).fetchall():
+        classes.setdefault(f"{int(row[0])}:{int(row[1])}", []).append({
+            "day": row[2], "period": row[3], "course_name": row[4], "course_code": row[5],
+            "course_type": row[6], "faculty_name": row[7]
+        })
+    faculties = {}
+    for row in cur.execute("""
+        SELECT gt.faculty_id, gt.day, gt.period, c.course_name, c.course_code, c.course_type,
+               d.dept_name, gt.semester
+        FROM generated_timetable gt
+        JOIN courses c ON gt.course_id = c.course_id
+        JOIN departments d ON gt.dept_id = d.dept_id
+        WHERE gt.faculty_id IS NOT NULL
+    """).fetchall():
+        faculties.setdefault(str(int(row[0])), []).append({
+            "day": row[1], "period": row[2], "course_name": row[3], "course_code": row[4],
+            "course_type": row[5], "dept_name": row[6], "semester": row[7]
+        })
+    cur.executemany("INSERT OR REPLACE INTO timetable_snapshots (kind, snapshot_key, payload) VALUES (?, ?, ?)",
+                    [("class", key, json.dumps(cells)) for key, cells in classes.items()]
+                    + [("faculty", key, json.dumps(cells)) for key, cells in faculties.items()])
+
+
+def _generation_runs(cur):
+    # Seed and quality score of each seeded generation, see attempts.py
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS generation_runs(
+        run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        dept_ids TEXT NOT NULL,
+        mode TEXT NOT NULL,
+        attempts INTEGER NOT NULL,
+        seed INTEGER NOT NULL,
+        score REAL NOT NULL,
+        quality TEXT NOT NULL
+    )""")
+
+
+def _timetable_staging(cur):
+    # Staged and previous generations, see publish.py
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS generated_timetable_staging(
+        stage_id VARCHAR(32) NOT NULL,
+        staged_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        dept_id INTEGER,
+        semester INTEGER,
+        day VARCHAR(16),
+        period INTEGER,
+        course_id INTEGER,
+        faculty_id INTEGER
+    )""")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_timetable_staging_stage ON generated_timetable_staging(stage_id)")
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS generated_timetable_previous(
+        dept_id INTEGER,
+        semester INTEGER,
+        day VARCHAR(16),
+        period INTEGER,
+        course_id INTEGER,
+        faculty_id INTEGER,
+        replaced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_timetable_previous_dept ON generated_timetable_previous(dept_id)")
+
+
+def _timetable_history(cur):
+    # Versioned cell deltas of generated_timetable, see history.py
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS timetable_versions(
+        version_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        source VARCHAR(32) NOT NULL,
+        dept_ids TEXT NOT NULL,
+        changed_cells INTEGER NOT NULL
+    )""")
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS timetable_history_cells(
+        cell_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        dept_id INTEGER NOT NULL,
+        semester INTEGER NOT NULL,
+        day VARCHAR(16) NOT NULL,
+        period INTEGER NOT NULL
+    )""")
+    cur.execute("""
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_history_cells_key
+    ON timetable_history_cells(dept_id, semester, day, period)""")
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS timetable_cell_changes(
+        version_id INTEGER NOT NULL,
+        cell_id INTEGER NOT NULL,
+        course_id INTEGER,
+        faculty_id INTEGER
+    )""")
+    # A cell's value at a version (covering), and the cells one range of versions touched
+    cur.execute("""
+    CREATE INDEX IF NOT EXISTS idx_cell_changes_cell
+    ON timetable_cell_changes(cell_id, version_id, course_id, faculty_id)""")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_cell_changes_version ON timetable_cell_changes(version_id, cell_id)")
+    # What is generated today becomes the first version: every occupied cell changes in it
+    dept_ids = [row[0] for row in cur.execute(
+        "SELECT DISTINCT dept_id FROM generated_timetable WHERE dept_id IS NOT NULL ORDER BY dept_id").fetchall()]
+    if not dept_ids:
+        return
+    cur.execute("""
+        INSERT INTO timetable_history_cells (dept_id, semester, day, period)
+        SELECT DISTINCT dept_id, semester, day, period FROM generated_timetable
+        WHERE dept_id IS NOT NULL AND semester IS NOT NULL AND day IS NOT NULL AND period IS NOT NULL
+    """)
+    cells = cur.execute("SELECT COUNT(*) FROM timetable_history_cells").fetchone()[0]
+    cur.execute("INSERT INTO timetable_versions (source, dept_ids, changed_cells) VALUES (?, ?, ?)",
+                ("baseline", json.dumps(dept_ids), cells))
+    cur.execute("""
+        INSERT INTO timetable_cell_changes (version_id, cell_id, course_id, faculty_id)
+        SELECT DISTINCT ?, h.cell_id, gt.course_id, gt.faculty_id
+        FROM generated_timetable gt
+        JOIN timetable_history_cells h
+          ON h.dept_id = gt.dept_id AND h.semester = gt.semester AND h.day = gt.day AND h.period = gt.period
+    """, (cur.lastrowid,))
+
+
+def _faculty_workload(cur):
+    # Per-faculty load aggregates, see workload.py
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS faculty_workload(
+        faculty_id INTEGER PRIMARY KEY,
+        total_periods INTEGER NOT NULL,
+        teaching_days INTEGER NOT NULL,
+        peak_day_periods INTEGER NOT NULL,
+        max_run INTEGER NOT NULL,
+        runs INTEGER NOT NULL,
+        gap_periods INTEGER NOT NULL,
+        departments_served INTEGER NOT NULL,
+        periods_per_day TEXT NOT NULL,
+        dept_ids TEXT NOT NULL
+    )""")
+    # Backfill from the rows the faculty snapshots are built from
+    days, served = {}, {}
+    for faculty_id, dept_id, day, period in cur.execute("""
+        SELECT gt.faculty_id, gt.dept_id, gt.day, gt.period
+        FROM generated_timetable gt
+        JOIN courses c ON gt.course_id = c.course_id
+        JOIN departments d ON gt.dept_id = d.dept_id
+        WHERE gt.faculty_id IS NOT NULL
+    """).fetchall():
+        per_day = days.setdefault(faculty_id, {})
+        count, mask = per_day.get(day, (0, 0))
+        per_day[day] = (count + 1, mask | (1 << period))
+        served.setdefault(faculty_id, set()).add(dept_id)
+    cur.executemany("""
+        INSERT INTO faculty_workload (faculty_id, total_periods, teaching_days, peak_day_periods, max_run, runs,
+                                      gap_periods, departments_served, periods_per_day, dept_ids)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [(faculty_id, *_workload_row(per_day), len(served[faculty_id]),
+          json.dumps({day: count for day, (count, _) in per_day.items()}), json.dumps(sorted(served[faculty_id])))
+         for faculty_id, per_day in days.items()])
+
+
+def _workload_row(per_day):
+    """(total_periods, teaching_days, peak_day_periods, max_run, runs, gap_periods) from {day: (count, mask)}."""
+    runs = max_run = gaps = 0
+    for _, mask in per_day.values():
+        runs += bin(mask & ~(mask << 1)).count("1")
+        run, length = mask, 0
+        while run:
+            run &= run << 1
+            length += 1
+        max_run = max(max_run, length)
+        low = (mask & -mask).bit_length()
+        gaps += mask.bit_length() - low + 1 - bin(mask).count("1")
+    counts = [count for count, _ in per_day.values()]
+    return sum(counts), len(counts), max(counts), max_run, runs, gaps
+
+
+# (version, description, function(cursor))
+MIGRATIONS = [
+    (1, "base schema", _base_schema),
+    (2, "hot-path indexes", _hot_path_indexes),
+    (3, "data version counters", _data_versions),
+    (4, "timetable snapshots", _timetable_snapshots),
+    (5, "generation runs", _generation_runs),
+    (6, "timetable staging", _timetable_staging),
+    (7, "timetable history", _timetable_history),
+    (8, "faculty workload", _faculty_workload),
+]
+
+
+def current_version(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS schema_version(
+        version INTEGER PRIMARY KEY,
+        description VARCHAR(255),
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""")
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def migrate(conn):
+    """Applies every pending migration. Returns the list of versions applied."""
+    applied = []
+    version = current_version(conn)
+    for number, description, apply in MIGRATIONS:
+        if number <= version:
+            continue
+        conn.execute("BEGIN")
+        try:
+            apply(conn.cursor())
+            conn.execute("INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                         (number, description))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(number)
+    return applied
+
+
+# =========================================================
+# QUERY PLAN CHECKS
+# =========================================================
+# The read and generator hot paths, with representative parameters. Each must
+# be answered from an index — check_query_plans() reports any that regress to
+# a full table scan.
+HOT_PATH_QUERIES = {
+    "student grid": ("""
+        SELECT gt.day, gt.period, c.course_name, c.course_code, c.course_type, f.faculty_name
+        FROM generated_timetable gt
+        JOIN courses c ON gt.course_id = c.course_id
+        JOIN faculties f ON gt.faculty_id = f.faculty_id
+        WHERE gt.dept_id=? AND gt.semester=?
+    """, (1, 1)),
+    "faculty grid": ("""
+        SELECT gt.day, gt.period, c.course_name, c.course_code, c.course_type, d.dept_name, gt.semester
+        FROM generated_timetable gt
+        JOIN courses c ON gt.course_id = c.course_id
+        JOIN departments d ON gt.dept_id = d.dept_id
+        WHERE gt.faculty_id=?
+    """, (1,)),
+    "generator semesters": ("SELECT DISTINCT semester FROM courses WHERE dept_id=?", (1,)),
+    "generator courses": ("""
+        SELECT course_id, credits, faculty_id, course_type
+        FROM courses WHERE dept_id=? AND semester=?
+    """, (1, 1)),
+}
+
+
+def full_scans(conn, sql, params=()):
+    """Returns the EXPLAIN QUERY PLAN steps of sql that scan a table without an index."""
+    if conn.dialect == "mysql":
+        # access type ALL is MySQL's full table scan
+        rows = conn.execute("EXPLAIN " + sql, params).fetchall()
+        return [f"SCAN {row['table']}" for row in rows if row["type"] == "ALL"]
+    rows = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    return [row[3] for row in rows if row[3].startswith("SCAN ") and "INDEX" not in row[3]]
+
+
+def check_query_plans(conn, queries=None):
+    """Returns {query name: [full scan steps]} for every hot-path query that full-scans."""
+    problems = {}
+    for name, (sql, params) in (queries or HOT_PATH_QUERIES).items():
+        scans = full_scans(conn, sql, params)
+        if scans:
+            problems[name] = scans
+    return problems
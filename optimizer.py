@@ -0,0 +1,235 @@
+import math
+import random
+import time
+
+from engine import PlacementEngine
+from scoring import SCORE_WEIGHTS, mask_gaps
+
+
+# =========================================================
+# LOCAL-SEARCH OPTIMIZER
+# =========================================================
+# Simulated annealing over a finished placement. A step either moves one
+# placed period (or lab pair) to another slot of its class, or swaps two
+# theory periods of a class. Steps are only tried when the PlacementEngine
+# checks allow them, so faculty and class double-booking, labs across a break
+# and adjacent same-course periods can never appear. Each step is scored by
+# recomputing only the faculty days, class and course days it touched.
+
+DEFAULT_OPTIMIZE_BUDGET = 2.0
+START_TEMPERATURE = 4.0
+END_TEMPERATURE = 0.05
+SWAP_SHARE = 0.5          # share of steps that try a swap rather than a move
+CLOCK_CHECK_EVERY = 256   # steps between time budget checks
+
+
+def _popcount(mask):
+    return bin(mask).count("1")
+
+
+class _Search:
+    def __init__(self, days, periods_per_day, break_after_periods, faculty_busy, rows, course_types):
+        self.engine = engine = PlacementEngine(days, periods_per_day, break_after_periods)
+        engine.faculty_busy = {fid: list(masks) for fid, masks in faculty_busy.items()}
+        self.course_types = course_types
+
+        # Items are [dept_id, semester, course_id, faculty_id, is_lab, d, p]; a lab is one item at its first period
+        self.items = []
+        lab_periods = {}
+        for dept_id, semester, day, period, course_id, faculty_id in rows:
+            d = engine.day_index[day]
+            if course_types.get(course_id) == "lab":
+                lab_periods.setdefault((dept_id, semester, course_id, faculty_id, d), []).append(period)
+            else:
+                self.items.append([dept_id, semester, course_id, faculty_id, False, d, period])
+        for (dept_id, semester, course_id, faculty_id, d), periods in lab_periods.items():
+            periods.sort()
+            # Consecutive pairs are one lab each; anything unpaired is left where it is as a single
+            i = 0
+            while i < len(periods):
+                if i + 1 < len(periods) and periods[i + 1] == periods[i] + 1:
+                    self.items.append([dept_id, semester, course_id, faculty_id, True, d, periods[i]])
+                    i += 2
+                else:
+                    self.items.append([dept_id, semester, course_id, faculty_id, None, d, periods[i]])
+                    i += 1
+        for item in self.items:
+            engine.apply(item[0], item[1], item[2], item[3], item[5], self._mask(item, item[6]))
+
+        self.by_class = {}
+        for n, item in enumerate(self.items):
+            if item[4] is False:
+                self.by_class.setdefault((item[0], item[1]), []).append(n)
+
+    @staticmethod
+    def _mask(item, p):
+        return (1 << p) | (1 << (p + 1)) if item[4] else 1 << p
+
+    # ---------------------------------------------------------
+    # Cost
+    # ---------------------------------------------------------
+    def _class_cost(self, key):
+        loads = [_popcount(m) for m in self.engine.class_taken[key]]
+        return max(loads) - min(loads)
+
+    def _repeat_cost(self, key, d, course_id):
+        if self.course_types.get(course_id) == "lab":
+            return 0
+        positions = self.engine.course_positions.get((key[0], key[1], d), {})
+        return max(0, _popcount(positions.get(course_id, 0)) - 1)
+
+    def local_cost(self, faculty_days, classes, course_days):
+        busy = self.engine.faculty_busy
+        return (SCORE_WEIGHTS["idle_gaps"] * sum(mask_gaps(busy[f][d]) for f, d in faculty_days)
+                + SCORE_WEIGHTS["load_imbalance"] * sum(self._class_cost(k) for k in classes)
+                + SCORE_WEIGHTS["same_day_repeats"] * sum(self._repeat_cost(k, d, c) for k, d, c in course_days))
+
+    def total_cost(self):
+        faculty_days = {(item[3], d) for item in self.items for d in range(len(self.engine.days))}
+        classes = {(item[0], item[1]) for item in self.items}
+        course_days = {((item[0], item[1]), item[5], item[2]) for item in self.items}
+        return self.local_cost(faculty_days, classes, course_days)
+
+    # ---------------------------------------------------------
+    # Steps
+    # ---------------------------------------------------------
+    def _fits(self, item, d, p):
+        engine = self.engine
+        taken = engine._class_masks(item[0], item[1])
+        busy = engine._faculty_masks(item[3])
+        if item[4]:
+            return p < engine.periods_per_day and p not in engine.break_after_periods \
+                and engine.can_place_lab(taken, busy, d, p)
+        positions = engine.course_positions.get((item[0], item[1], d), {})
+        return engine.can_place_theory(taken, busy, positions, item[2], d, p)
+
+    def _place(self, item, d, p):
+        self.engine.apply(item[0], item[1], item[2], item[3], d, self._mask(item, p))
+        item[5], item[6] = d, p
+
+    def _lift(self, item):
+        self.engine.undo(item[0], item[1], item[2], item[3], item[5], self._mask(item, item[6]))
+
+    def try_move(self, item, d, p):
+        """Moves item to (d, p) if allowed. Returns an undo callable, or None."""
+        old_d, old_p = item[5], item[6]
+        self._lift(item)
+        if (d, p) != (old_d, old_p) and self._fits(item, d, p):
+            self._place(item, d, p)
+
+            def revert():
+                self._lift(item)
+                self._place(item, old_d, old_p)
+            return revert
+        self._place(item, old_d, old_p)
+        return None
+
+    def try_swap(self, a, b):
+        """Swaps the slots of theory items a and b if allowed. Returns an undo callable, or None."""
+        slot_a, slot_b = (a[5], a[6]), (b[5], b[6])
+        self._lift(a)
+        self._lift(b)
+        if self._fits(a, *slot_b):
+            self._place(a, *slot_b)
+            if self._fits(b, *slot_a):
+                self._place(b, *slot_a)
+
+                def revert():
+                    self._lift(a)
+                    self._lift(b)
+                    self._place(a, *slot_a)
+                    self._place(b, *slot_b)
+                return revert
+            self._lift(a)
+        self._place(a, *slot_a)
+        self._place(b, *slot_b)
+        return None
+
+    def rows(self):
+        days = self.engine.days
+        result = []
+        for dept_id, semester, course_id, faculty_id, is_lab, d, p in self.items:
+            result.append((dept_id, semester, days[d], p, course_id, faculty_id))
+            if is_lab:
+                result.append((dept_id, semester, days[d], p + 1, course_id, faculty_id))
+        return result
+
+
+def improve(days, periods_per_day, break_after_periods, faculty_busy, rows, course_types,
+            time_budget=DEFAULT_OPTIMIZE_BUDGET, max_iterations=None, rng=random):
+    """
+    Improves placed rows (dept_id, semester, day, period, course_id, faculty_id) by
+    simulated annealing for up to time_budget seconds (or max_iterations steps).
+    faculty_busy holds the {faculty_id: [mask per day]} slots of departments not
+    being regenerated. course_types maps course_id to "theory"/"lab".
+    Returns (rows, stats); the rows hold the same periods, only in better slots.
+    """
+    search = _Search(days, periods_per_day, break_after_periods, faculty_busy, rows, course_types)
+    engine = search.engine
+    items = search.items
+    movable = [n for n, item in enumerate(items) if item[4] is not None]
+    class_keys = [key for key, members in search.by_class.items() if len(members) > 1]
+
+    cost = start_cost = search.total_cost()
+    best_cost, best_slots = cost, [(item[5], item[6]) for item in items]
+    stats = {"iterations": 0, "accepted": 0, "cost_before": round(start_cost, 2)}
+    if not movable or not (time_budget or max_iterations):
+        stats["cost_after"] = stats["cost_before"]
+        return rows, stats
+
+    started = time.perf_counter()
+    deadline = started + time_budget if time_budget else None
+    temperature = START_TEMPERATURE
+    iteration = 0
+
+    while max_iterations is None or iteration < max_iterations:
+        if iteration % CLOCK_CHECK_EVERY == 0:
+            now = time.perf_counter()
+            if deadline is not None:
+                if now >= deadline:
+                    break
+                progress = (now - started) / time_budget
+            else:
+                progress = iteration / max_iterations if max_iterations else 0.0
+            temperature = START_TEMPERATURE * (END_TEMPERATURE / START_TEMPERATURE) ** progress
+        iteration += 1
+
+        if class_keys and rng.random() < SWAP_SHARE:
+            members = search.by_class[rng.choice(class_keys)]
+            a, b = items[rng.choice(members)], items[rng.choice(members)]
+            if a is b or a[2] == b[2]:
+                continue
+            key = (a[0], a[1])
+            faculty_days = {(a[3], a[5]), (a[3], b[5]), (b[3], a[5]), (b[3], b[5])}
+            course_days = {(key, a[5], a[2]), (key, b[5], a[2]), (key, a[5], b[2]), (key, b[5], b[2])}
+            before = search.local_cost(faculty_days, (key,), course_days)
+            revert = search.try_swap(a, b)
+        else:
+            item = items[rng.choice(movable)]
+            if item[4]:
+                d, p = rng.choice(engine.lab_slots)
+            else:
+                d, p = rng.choice(engine.theory_slots)
+            key = (item[0], item[1])
+            faculty_days = {(item[3], item[5]), (item[3], d)}
+            course_days = {(key, item[5], item[2]), (key, d, item[2])}
+            before = search.local_cost(faculty_days, (key,), course_days)
+            revert = search.try_move(item, d, p)
+        if revert is None:
+            continue
+
+        delta = search.local_cost(faculty_days, (key,), course_days) - before
+        if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+            cost += delta
+            stats["accepted"] += 1
+            if cost < best_cost - 1e-9:
+                best_cost, best_slots = cost, [(item[5], item[6]) for item in items]
+        else:
+            revert()
+
+    stats["iterations"] = iteration
+    stats["cost_after"] = round(best_cost, 2)
+    stats["seconds"] = round(time.perf_counter() - started, 4)
+    for item, (d, p) in zip(items, best_slots):
+        item[5], item[6] = d, p
+    return search.rows(), stats
@@ -0,0 +1,174 @@
+import multiprocessing
+import os
+import random
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from engine import PlacementEngine
+from solver import solve_classes
+
+
+# =========================================================
+# PARALLEL MULTI-DEPARTMENT GENERATION
+# =========================================================
+# Departments only interact through faculty busy slots. Departments that share
+# no faculty can therefore be placed in separate processes, each on its own
+# engine seeded with the busy slots of the faculties it uses.
+
+def group_departments(classes):
+    """
+    Splits (dept_id, semester, courses_list) classes into groups whose departments
+    share no faculty. Returns a list of class lists, largest group first.
+    """
+    parent = {}
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(a, b):
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[rb] = ra
+
+    for dept_id, _, courses_list in classes:
+        parent.setdefault(("dept", dept_id), ("dept", dept_id))
+        for course in courses_list:
+            if course["faculty_id"] is None:
+                continue
+            node = ("faculty", course["faculty_id"])
+            parent.setdefault(node, node)
+            union(("dept", dept_id), node)
+
+    groups = {}
+    for cls in classes:
+        groups.setdefault(find(("dept", cls[0])), []).append(cls)
+    return sorted(groups.values(), key=len, reverse=True)
+
+
+# =========================================================
+# SHARED PROCESS POOL
+# =========================================================
+# Generation runs on the job worker thread of a threaded server, so workers
+# must not be forked from this process: a fork would copy locks other threads
+# hold. One forkserver pool is started on first use and reused by every
+# generation (parallel groups here, best-of-N attempts in attempts.py).
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1,
+                                        mp_context=multiprocessing.get_context("forkserver"))
+        return _pool
+
+
+def _discard_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_jobs(fn, jobs, workers):
+    """
+    Runs fn(job) for every job on the shared pool, at most `workers` at a time.
+    Yields (index, result) as jobs finish.
+    """
+    pool = get_pool()
+    pending = {}
+    queued = iter(enumerate(jobs))
+    try:
+        while True:
+            for n, job in queued:
+                pending[pool.submit(fn, job)] = n
+                if len(pending) >= workers:
+                    break
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+    except BrokenProcessPool:
+        # A worker died; the next generation starts a fresh pool
+        _discard_pool(pool)
+        raise
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _solve_group(job):
+    days, periods_per_day, break_after_periods, busy, classes, mode, time_budget, seed = job
+    engine = PlacementEngine(days, periods_per_day, break_after_periods)
+    engine.faculty_busy = busy
+    rng = random.Random(seed)
+
+    if mode == "solver":
+        return solve_classes(engine, classes, time_budget, rng=rng)
+
+    rows = []
+    unplaced_by_class = []
+    for dept_id, semester, courses_list in classes:
+        class_rows, unplaced = engine.place_class(dept_id, semester, courses_list, rng)
+        rows.extend(class_rows)
+        if unplaced:
+            unplaced_by_class.append((dept_id, semester, unplaced))
+    return rows, unplaced_by_class, False
+
+
+def place_parallel(engine, classes, mode="greedy", time_budget=None, workers=None, on_placed=None):
+    """
+    Places classes on faculty-disjoint groups in the shared process pool.
+    engine supplies the settings and the busy slots of departments not being regenerated.
+    Returns (rows, unplaced_by_class, timed_out) like solve_classes; on_placed(dept_id, semester)
+    is called for every class of a group once that group finishes.
+    """
+    groups = group_departments(classes)
+    if not groups:
+        return [], [], False
+    workers = min(workers or os.cpu_count() or 1, len(groups))
+
+    # Groups beyond the worker count queue up, so they share the budget
+    group_budget = time_budget * min(1.0, workers / len(groups)) if time_budget else time_budget
+
+    jobs = []
+    for group in groups:
+        faculty_ids = {c["faculty_id"] for _, _, courses_list in group for c in courses_list}
+        busy = {fid: list(engine.faculty_busy[fid]) for fid in faculty_ids if fid in engine.faculty_busy}
+        # sqlite3.Row does not pickle, so ship plain dicts to the workers
+        plain = [(dept_id, semester, [dict(c) for c in courses_list]) for dept_id, semester, courses_list in group]
+        jobs.append((engine.days, engine.periods_per_day, engine.break_after_periods, busy, plain,
+                     mode, group_budget, random.getrandbits(32)))
+
+    def group_done(group):
+        if on_placed:
+            for dept_id, semester, _ in group:
+                on_placed(dept_id, semester)
+
+    results = [None] * len(jobs)
+    if workers <= 1:
+        for n, job in enumerate(jobs):
+            results[n] = _solve_group(job)
+            group_done(groups[n])
+    else:
+        for n, result in run_jobs(_solve_group, jobs, workers):
+            results[n] = result
+            group_done(groups[n])
+
+    rows = []
+    unplaced_by_class = []
+    timed_out = False
+    for group_rows, group_unplaced, group_timed_out in results:
+        rows.extend(group_rows)
+        unplaced_by_class.extend(group_unplaced)
+        timed_out = timed_out or group_timed_out
+    return rows, unplaced_by_class, timed_out
@@ -0,0 +1,198 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from cache import bump_version, get_version
+from database import begin_write
+from history import changed_cells, live_cells, record_version, write_version
+from snapshots import build_snapshots, faculties_of_departments, refresh_snapshots, write_snapshots
+
+
+# =========================================================
+# STAGED TIMETABLE PUBLISHING
+# =========================================================
+# A generation never touches generated_timetable while it places. New rows go
+# to generated_timetable_staging under a stage id (committed on their own),
+# then one short write transaction (see begin_write) swaps them in: the departments'
+# live rows move to generated_timetable_previous and the staged rows take
+# their place. Readers see the old timetable until that commit and the new
+# one after it, never a half-written or empty one. The previous rows stay
+# available for rollback_departments().
+#
+# Everything derived from the new rows (the history delta, class and faculty
+# snapshots, workload rows) is read before the write lock is taken. The
+# transaction then only checks the "generation" version, swaps rows and writes
+# the precomputed results. Every generated_timetable writer bumps that version,
+# so an unchanged version means nothing the precomputation read has changed.
+
+TIMETABLE_COLUMNS = "dept_id, semester, day, period, course_id, faculty_id"
+STALE_STAGE_DAYS = 1  # stages left behind by a crashed generation are dropped after this
+
+
+def _marks(values):
+    return ",".join("?" * len(values))
+
+
+def stage_rows(conn, rows):
+    """Writes rows to staging in their own transaction and returns the stage id."""
+    stage_id = uuid.uuid4().hex
+    cutoff = datetime.now(timezone.utc) - timedelta(days=STALE_STAGE_DAYS)
+    conn.execute("DELETE FROM generated_timetable_staging WHERE staged_at < ?",
+                 (cutoff.strftime("%Y-%m-%d %H:%M:%S"),))
+    conn.executemany(f"""
+        INSERT INTO generated_timetable_staging (stage_id, {TIMETABLE_COLUMNS})
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, [(stage_id,) + tuple(row) for row in rows])
+    conn.commit()
+    return stage_id
+
+
+def discard_stage(conn, stage_id):
+    conn.execute("DELETE FROM generated_timetable_staging WHERE stage_id=?", (stage_id,))
+    conn.commit()
+
+
+def publish_stage(conn, stage_id, dept_ids, expected_version, source="generation"):
+    """
+    Swaps the staged rows in for dept_ids in one short transaction, provided no
+    other generated_timetable write committed since expected_version (the
+    "generation" data version read before placement). Returns False, discarding
+    the stage, if the timetable changed. source labels the history version.
+    """
+    dept_ids = sorted(set(dept_ids))
+    marks = _marks(dept_ids)
+    conn.commit()
+    if get_version(conn, "generation") != expected_version:
+        discard_stage(conn, stage_id)
+        return False
+    affected_faculties = faculties_of_departments(conn, dept_ids)
+    affected_faculties.update(row[0] for row in conn.execute(
+        "SELECT DISTINCT faculty_id FROM generated_timetable_staging WHERE stage_id=?", (stage_id,)).fetchall())
+    changed = changed_cells(conn, dept_ids, live_cells(conn, dept_ids, stage_id))
+    snapshots = build_snapshots(conn, dept_ids, affected_faculties, stage_id)
+    conn.commit()
+
+    begin_write(conn, "generation")
+    try:
+        if get_version(conn, "generation") != expected_version:
+            conn.rollback()
+            discard_stage(conn, stage_id)
+            return False
+
+        conn.execute(f"DELETE FROM generated_timetable_previous WHERE dept_id IN ({marks})", dept_ids)
+        conn.execute(f"""
+            INSERT INTO generated_timetable_previous ({TIMETABLE_COLUMNS})
+            SELECT {TIMETABLE_COLUMNS} FROM generated_timetable WHERE dept_id IN ({marks})
+        """, dept_ids)
+        conn.execute(f"DELETE FROM generated_timetable WHERE dept_id IN ({marks})", dept_ids)
+        conn.execute(f"""
+            INSERT INTO generated_timetable ({TIMETABLE_COLUMNS})
+            SELECT {TIMETABLE_COLUMNS} FROM generated_timetable_staging WHERE stage_id=?
+        """, (stage_id,))
+        conn.execute("DELETE FROM generated_timetable_staging WHERE stage_id=?", (stage_id,))
+
+        write_version(conn, source, dept_ids, changed)
+        write_snapshots(conn, snapshots)
+        bump_version(conn, "generation")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return True
+
+
+def _rollback_clashes(conn, candidates):
+    """
+    {dept_id: [(faculty_id, day, period), ...]} for the candidates whose previous
+    rows would double-book a faculty: against the live rows of every department
+    not rolled back, or against another candidate's previous rows. A refused
+    department keeps its live rows, which the others are then checked against.
+    """
+    previous = {}
+    for row in conn.execute(f"""
+        SELECT p.dept_id, p.faculty_id, p.day, p.period
+        FROM generated_timetable_previous p
+        JOIN courses c ON p.course_id = c.course_id
+        JOIN faculties f ON p.faculty_id = f.faculty_id
+        WHERE p.dept_id IN ({_marks(candidates)})
+    """, list(candidates)).fetchall():
+        previous.setdefault(row[0], set()).add(tuple(row[1:]))
+    faculty_ids = sorted({slot[0] for slots in previous.values() for slot in slots})
+    live = {}
+    if faculty_ids:
+        for row in conn.execute(f"""
+            SELECT dept_id, faculty_id, day, period FROM generated_timetable
+            WHERE faculty_id IN ({_marks(faculty_ids)})
+        """, faculty_ids).fetchall():
+            live.setdefault(row[0], set()).add(tuple(row[1:]))
+
+    accepted = set(candidates)
+    clashes = {}
+    while True:
+        busy = {}  # (faculty_id, day, period) -> departments holding it after the rollback
+        for dept_id in set(live) | accepted:
+            for slot in (previous.get(dept_id, ()) if dept_id in accepted else live[dept_id]):
+                busy.setdefault(slot, set()).add(dept_id)
+        refused = {}
+        for dept_id in accepted:
+            slots = sorted(slot for slot in previous.get(dept_id, ()) if len(busy[slot]) > 1)
+            if slots:
+                refused[dept_id] = slots
+        if not refused:
+            return clashes
+        clashes.update(refused)
+        accepted -= refused.keys()
+
+
+def rollback_departments(conn, dept_ids):
+    """
+    Swaps each department's live rows with its previous version, so a second
+    rollback restores what was live. Rows whose course or faculty has since been
+    deleted are not restored. A department whose previous rows would double-book
+    a faculty (see _rollback_clashes) is left as it is.
+    Returns (rolled back dept ids, {refused dept_id: [(faculty_id, day, period), ...]}).
+    """
+    conn.commit()
+    begin_write(conn, "generation")
+    try:
+        marks = _marks(dept_ids)
+        candidates = [row[0] for row in conn.execute(f"""
+            SELECT DISTINCT dept_id FROM generated_timetable_previous WHERE dept_id IN ({marks})
+        """, list(dept_ids)).fetchall()]
+        clashes = _rollback_clashes(conn, candidates) if candidates else {}
+        rolled_back = [dept_id for dept_id in candidates if dept_id not in clashes]
+        if not rolled_back:
+            conn.rollback()
+            return [], clashes
+
+        marks = _marks(rolled_back)
+        stage_id = uuid.uuid4().hex
+        affected_faculties = faculties_of_departments(conn, rolled_back)
+        conn.execute(f"""
+            INSERT INTO generated_timetable_staging (stage_id, {TIMETABLE_COLUMNS})
+            SELECT ?, {TIMETABLE_COLUMNS} FROM generated_timetable WHERE dept_id IN ({marks})
+        """, [stage_id] + rolled_back)
+        conn.execute(f"DELETE FROM generated_timetable WHERE dept_id IN ({marks})", rolled_back)
+        conn.execute(f"""
+            INSERT INTO generated_timetable ({TIMETABLE_COLUMNS})
+            SELECT p.dept_id, p.semester, p.day, p.period, p.course_id, p.faculty_id
+            FROM generated_timetable_previous p
+            JOIN courses c ON p.course_id = c.course_id
+            JOIN faculties f ON p.faculty_id = f.faculty_id
+            WHERE p.dept_id IN ({marks})
+        """, rolled_back)
+        conn.execute(f"DELETE FROM generated_timetable_previous WHERE dept_id IN ({marks})", rolled_back)
+        conn.execute(f"""
+            INSERT INTO generated_timetable_previous ({TIMETABLE_COLUMNS})
+            SELECT {TIMETABLE_COLUMNS} FROM generated_timetable_staging WHERE stage_id=?
+        """, (stage_id,))
+        conn.execute("DELETE FROM generated_timetable_staging WHERE stage_id=?", (stage_id,))
+
+        record_version(conn, "rollback", rolled_back)
+        affected_faculties.update(faculties_of_departments(conn, rolled_back))
+        refresh_snapshots(conn, rolled_back, affected_faculties)
+        bump_version(conn, "generation")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return rolled_back, clashes
@@ -0,0 +1,67 @@
+# =========================================================
+# TIMETABLE QUALITY SCORE
+# =========================================================
+# One number to compare generation attempts by. Every term is a penalty, so
+# the score is 0 for a perfect timetable and more negative the worse it gets:
+#   unplaced_periods  - required periods left off the timetable
+#   idle_gaps         - free periods between a faculty's first and last class of a day
+#   load_imbalance    - per class, busiest day minus quietest day
+#   same_day_repeats  - extra theory periods of one course on the same day
+
+SCORE_WEIGHTS = {
+    "unplaced_periods": 100.0,
+    "idle_gaps": 2.0,
+    "load_imbalance": 1.0,
+    "same_day_repeats": 3.0,
+}
+
+
+def mask_gaps(mask):
+    """Unset bits between the lowest and highest set bit of a period mask."""
+    if not mask:
+        return 0
+    low = (mask & -mask).bit_length()
+    return mask.bit_length() - low + 1 - bin(mask).count("1")
+
+
+def score_timetable(days, rows, unplaced_by_class, course_types, faculty_busy=None):
+    """
+    Scores generated rows (dept_id, semester, day, period, course_id, faculty_id).
+    faculty_busy holds the {faculty_id: [mask per day]} slots of departments not
+    being regenerated, so faculty gaps count the whole week. Returns
+    {"score", "placement_rate", <each penalty term>}.
+    """
+    day_index = {day: i for i, day in enumerate(days)}
+    faculty_masks = {}
+    class_loads = {}
+    course_days = {}
+    for dept_id, semester, day, period, course_id, faculty_id in rows:
+        d = day_index[day]
+        masks = faculty_masks.get(faculty_id)
+        if masks is None:
+            busy = (faculty_busy or {}).get(faculty_id)
+            masks = faculty_masks[faculty_id] = list(busy) if busy else [0] * len(days)
+        masks[d] |= 1 << period
+        loads = class_loads.get((dept_id, semester))
+        if loads is None:
+            loads = class_loads[(dept_id, semester)] = [0] * len(days)
+        loads[d] += 1
+        if course_types.get(course_id) != "lab":
+            key = (dept_id, semester, d, course_id)
+            course_days[key] = course_days.get(key, 0) + 1
+
+    unplaced = sum(2 if a["course_type"] == "lab" else 1
+                   for _, _, assignments in unplaced_by_class for a in assignments)
+    terms = {
+        "unplaced_periods": unplaced,
+        "idle_gaps": sum(mask_gaps(m) for masks in faculty_masks.values() for m in masks),
+        "load_imbalance": sum(max(loads) - min(loads) for loads in class_loads.values()),
+        "same_day_repeats": sum(count - 1 for count in course_days.values()),
+    }
+    required = len(rows) + unplaced
+    result = {
+        "score": round(-sum(SCORE_WEIGHTS[name] * value for name, value in terms.items()), 2),
+        "placement_rate": round(len(rows) / required, 4) if required else 1.0,
+    }
+    result.update(terms)
+    return result
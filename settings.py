@@ -0,0 +1,101 @@
+import json
+from collections import namedtuple
+from types import MappingProxyType
+
+from cache import VersionedCache
+
+
+# =========================================================
+# TIMETABLE SETTINGS SERVICE
+# =========================================================
+# The timetable_settings row parsed once per change: working days split,
+# break JSON decoded and the period/break clock times computed. Views and the
+# generator share the same immutable object until /details saves again.
+
+DEFAULT_WORKING_DAYS = "Mon,Tue,Wed,Thu,Fri,Sat"
+
+TimetableSettings = namedtuple("TimetableSettings", [
+    "row",                  # raw timetable_settings row, for templates and the details form
+    "days",                 # ("Mon", "Tue", ...)
+    "periods_per_day",
+    "period_duration",
+    "start_time",
+    "break_after_periods",  # frozenset of periods followed by a break
+    "period_times",         # {period: "HH:MM - HH:MM"}
+    "break_times",          # {after_period: "HH:MM - HH:MM"}
+])
+
+
+def compute_period_times(start_time_str, period_duration, periods_per_day, break_details_str):
+    """
+    Returns {period_number: "HH:MM - HH:MM"} and {after_period: label} for break rows.
+    break_details_str is JSON: [{"after_period": 2, "duration": 15}, ...]
+    """
+    breaks = parse_breaks(break_details_str)  # {after_period: duration_minutes}
+
+    try:
+        h, m = map(int, start_time_str.split(":"))
+        current = h * 60 + m
+    except:
+        current = 9 * 60
+
+    def fmt(mins):
+        return f"{mins // 60:02d}:{mins % 60:02d}"
+
+    period_times = {}
+    break_times = {}  # {after_period: "HH:MM - HH:MM"}
+
+    for p in range(1, periods_per_day + 1):
+        period_end = current + period_duration
+        period_times[p] = f"{fmt(current)} - {fmt(period_end)}"
+        current = period_end
+        # Apply break after this period if one exists
+        if p in breaks:
+            break_end = current + breaks[p]
+            break_times[p] = f"{fmt(current)} - {fmt(break_end)}"
+            current = break_end
+
+    return period_times, break_times
+
+
+def parse_breaks(break_details_str):
+    """Returns {after_period: duration_minutes} from the break_details JSON, {} if unreadable."""
+    breaks = {}
+    if break_details_str:
+        try:
+            for b in json.loads(break_details_str):
+                breaks[int(b["after_period"])] = int(b["duration"])
+        except:
+            pass
+    return breaks
+
+
+def load_settings(conn):
+    row = conn.execute("SELECT * FROM timetable_settings LIMIT 1").fetchone()
+    if not row:
+        return None
+
+    periods_per_day = row["periods_per_day"]
+    working_days = row["working_days"] if row["working_days"] else DEFAULT_WORKING_DAYS
+    start_time = row["start_time"] if row["start_time"] else "09:00"
+    period_times, break_times = compute_period_times(start_time, row["period_duration"], periods_per_day,
+                                                     row["break_details"])
+    return TimetableSettings(
+        row=row,
+        days=tuple(d.strip() for d in working_days.split(",")),
+        periods_per_day=periods_per_day,
+        period_duration=row["period_duration"],
+        start_time=start_time,
+        break_after_periods=frozenset(parse_breaks(row["break_details"])),
+        period_times=MappingProxyType(period_times),
+        break_times=MappingProxyType(break_times),
+    )
+
+
+# Bumped by /details when it saves, see cache.py
+settings_cache = VersionedCache("settings", load_settings)
+
+
+def get_settings(conn):
+    """Returns the current TimetableSettings, or None when nothing is configured yet."""
+    return settings_cache.get(conn)
@@ -0,0 +1,177 @@
+import json
+
+from workload import delete_workloads, summarize, write_workload
+
+
+# =========================================================
+# TIMETABLE SNAPSHOTS
+# =========================================================
+# Denormalized copies of each class (dept + semester) and faculty timetable,
+# written in the same transaction as the generated_timetable change that
+# produced them. Views read one row by primary key instead of joining
+# generated_timetable with courses, faculties and departments per request.
+
+CHUNK = 500  # stays under SQLite's bound-parameter limit
+
+
+def _chunks(values):
+    values = list(values)
+    for i in range(0, len(values), CHUNK):
+        yield values[i:i + CHUNK]
+
+
+def class_key(dept_id, semester):
+    return f"{int(dept_id)}:{int(semester)}"
+
+
+def _write(conn, kind, key, cells):
+    conn.execute("INSERT OR REPLACE INTO timetable_snapshots (kind, snapshot_key, payload) VALUES (?, ?, ?)",
+                 (kind, key, json.dumps(cells)))
+
+
+def _read(conn, kind, key):
+    row = conn.execute("SELECT payload FROM timetable_snapshots WHERE kind=? AND snapshot_key=?",
+                       (kind, key)).fetchone()
+    if row is None:
+        return None
+    timetable = {}
+    for cell in json.loads(row[0]):
+        day, period = cell.pop("day"), cell.pop("period")
+        timetable[(day, period)] = cell
+    return timetable
+
+
+def read_class_snapshot(conn, dept_id, semester):
+    """Returns {(day, period): entry} for a dept+semester, or None if it has no snapshot."""
+    try:
+        key = class_key(dept_id, semester)
+    except (TypeError, ValueError):
+        return None
+    return _read(conn, "class", key)
+
+
+def read_faculty_snapshot(conn, faculty_id):
+    """Returns {(day, period): entry} for a faculty, or None if it has no snapshot."""
+    try:
+        key = str(int(faculty_id))
+    except (TypeError, ValueError):
+        return None
+    return _read(conn, "faculty", key)
+
+
+def faculties_of_departments(conn, dept_ids):
+    """Faculty ids currently timetabled in any of dept_ids — call before deleting their rows."""
+    faculty_ids = set()
+    for chunk in _chunks(dept_ids):
+        rows = conn.execute(f"""
+            SELECT DISTINCT faculty_id FROM generated_timetable
+            WHERE dept_id IN ({",".join("?" * len(chunk))})
+        """, chunk).fetchall()
+        faculty_ids.update(row[0] for row in rows)
+    return faculty_ids
+
+
+def _timetable_source(dept_ids, stage_id):
+    """
+    (FROM clause, params) for generated_timetable as it is, or, with stage_id, as
+    it will be once the staged rows replace those of dept_ids (see publish.py).
+    """
+    if stage_id is None:
+        return "generated_timetable", []
+    columns = "dept_id, semester, day, period, course_id, faculty_id"
+    marks = ",".join("?" * len(dept_ids))
+    return (f"""(SELECT {columns} FROM generated_timetable WHERE dept_id NOT IN ({marks})
+                UNION ALL
+                SELECT {columns} FROM generated_timetable_staging WHERE stage_id=?)""",
+            list(dept_ids) + [stage_id])
+
+
+def build_snapshots(conn, dept_ids=(), faculty_ids=(), stage_id=None):
+    """
+    Reads everything refresh_snapshots writes for dept_ids and faculty_ids,
+    without writing. With stage_id the snapshots describe the timetable after
+    that stage replaces dept_ids. Pass the result to write_snapshots.
+    """
+    dept_ids = list(dept_ids)
+    faculty_ids = [fid for fid in faculty_ids if fid is not None]
+    source, source_params = _timetable_source(dept_ids, stage_id)
+    classes = {}
+    for chunk in _chunks(dept_ids):
+        marks = ",".join("?" * len(chunk))
+        rows = conn.execute(f"""
+            SELECT gt.dept_id, gt.semester, gt.day, gt.period,
+                   c.course_name, c.course_code, c.course_type, f.faculty_name
+            FROM {source} gt
+            JOIN courses c ON gt.course_id = c.course_id
+            JOIN faculties f ON gt.faculty_id = f.faculty_id
+            WHERE gt.dept_id IN ({marks})
+        """, source_params + chunk).fetchall()
+        for row in rows:
+            classes.setdefault(class_key(row["dept_id"], row["semester"]), []).append({
+                "day": row["day"],
+                "period": row["period"],
+                "course_name": row["course_name"],
+                "course_code": row["course_code"],
+                "course_type": row["course_type"],
+                "faculty_name": row["faculty_name"]
+            })
+
+    faculties = {}
+    served = {}
+    for chunk in _chunks(faculty_ids):
+        marks = ",".join("?" * len(chunk))
+        rows = conn.execute(f"""
+            SELECT gt.faculty_id, gt.day, gt.period, c.course_name, c.course_code, c.course_type,
+                   d.dept_name, gt.semester, gt.dept_id
+            FROM {source} gt
+            JOIN courses c ON gt.course_id = c.course_id
+            JOIN departments d ON gt.dept_id = d.dept_id
+            WHERE gt.faculty_id IN ({marks})
+        """, source_params + chunk).fetchall()
+        for row in rows:
+            served.setdefault(str(row["faculty_id"]), set()).add(row["dept_id"])
+            faculties.setdefault(str(row["faculty_id"]), []).append({
+                "day": row["day"],
+                "period": row["period"],
+                "course_name": row["course_name"],
+                "course_code": row["course_code"],
+                "course_type": row["course_type"],
+                "dept_name": row["dept_name"],
+                "semester": row["semester"]
+            })
+    return {
+        "dept_ids": dept_ids,
+        "faculty_ids": faculty_ids,
+        "classes": classes,
+        # The faculty's workload report comes from the same rows
+        "faculties": {key: (cells, summarize(cells, served[key])) for key, cells in faculties.items()},
+    }
+
+
+def write_snapshots(conn, built):
+    """Replaces the snapshots (and workload rows) build_snapshots read. Runs in the caller's transaction."""
+    for dept_id in built["dept_ids"]:
+        # Keys "<dept>:<semester>" sort between "<dept>:" and "<dept>;" — a primary-key range
+        conn.execute("""
+            DELETE FROM timetable_snapshots
+            WHERE kind='class' AND snapshot_key >= ? AND snapshot_key < ?
+        """, (f"{int(dept_id)}:", f"{int(dept_id)};"))
+    for key, cells in built["classes"].items():
+        _write(conn, "class", key, cells)
+
+    for chunk in _chunks(built["faculty_ids"]):
+        marks = ",".join("?" * len(chunk))
+        conn.execute(f"DELETE FROM timetable_snapshots WHERE kind='faculty' AND snapshot_key IN ({marks})",
+                     [str(int(fid)) for fid in chunk])
+        delete_workloads(conn, chunk)
+    for key, (cells, summary) in built["faculties"].items():
+        _write(conn, "faculty", key, cells)
+        write_workload(conn, int(key), summary)
+
+
+def refresh_snapshots(conn, dept_ids=(), faculty_ids=()):
+    """
+    Rebuilds the class snapshots of every semester of dept_ids and the snapshots
+    of faculty_ids from generated_timetable. Runs in the caller's transaction.
+    """
+    write_snapshots(conn, build_snapshots(conn, dept_ids, faculty_ids))
@@ -0,0 +1,187 @@
+import random
+import time
+
+from engine import build_assignments
+
+
+# =========================================================
+# BACKTRACKING SOLVER MODE
+# =========================================================
+# Works on the same PlacementEngine masks as the greedy pass. Each class
+# (dept + semester) is searched with most-constrained-first variable order,
+# forward checking of every remaining course's slot domain, and a budget on
+# both time and backtracks. Whatever the search cannot finish is filled
+# first-fit from the best partial solution and reported as unplaced.
+
+DEFAULT_TIME_BUDGET = 10.0      # seconds for a whole run
+DEFAULT_MAX_BACKTRACKS = 20000  # per class
+
+
+class _BudgetExhausted(Exception):
+    pass
+
+
+def _build_units(courses_list):
+    # Theory periods of one course are interchangeable, so they become a single
+    # unit with a remaining count instead of `credits` separate variables.
+    units = []
+    theory_units = {}
+    for a in build_assignments(courses_list):
+        if a["course_type"] == "lab":
+            units.append(dict(a, need=1, last=-1))
+            continue
+        unit = theory_units.get(a["course_id"])
+        if unit is None:
+            unit = theory_units[a["course_id"]] = dict(a, need=0, last=-1)
+            units.append(unit)
+        unit["need"] += 1
+    return units
+
+
+def _unit_periods(unit):
+    return 2 * unit["need"] if unit["course_type"] == "lab" else unit["need"]
+
+
+def solve_class(engine, dept_id, semester, courses_list, time_budget,
+                max_backtracks=DEFAULT_MAX_BACKTRACKS, rng=random):
+    """
+    Places one dept+semester on the engine.
+    Returns (rows, unplaced_assignments, timed_out).
+    """
+    units = _build_units(courses_list)
+    rng.shuffle(units)  # tie-break order between equally constrained units
+
+    deadline = time.monotonic() + time_budget
+    stack = []  # (unit, slot_index, day_idx, mask, previous_last)
+    best = {"periods": -1, "stack": []}
+    counters = {"periods": 0, "backtracks": 0}
+
+    def domain(unit):
+        if unit["course_type"] == "lab":
+            return engine.lab_domain(dept_id, semester, unit["faculty_id"])
+        # Only slots after the last one used keeps the interchangeable periods
+        # of a course from being tried in every permutation.
+        return engine.theory_domain(dept_id, semester, unit["course_id"], unit["faculty_id"], unit["last"] + 1)
+
+    def place(unit, i):
+        if unit["course_type"] == "lab":
+            d, p = engine.lab_slots[i]
+            mask = (1 << p) | (1 << (p + 1))
+            counters["periods"] += 2
+        else:
+            d, p = engine.theory_slots[i]
+            mask = 1 << p
+            counters["periods"] += 1
+        engine.apply(dept_id, semester, unit["course_id"], unit["faculty_id"], d, mask)
+        stack.append((unit, i, d, mask, unit["last"]))
+        unit["need"] -= 1
+        unit["last"] = i
+
+    def unplace():
+        unit, i, d, mask, previous_last = stack.pop()
+        engine.undo(dept_id, semester, unit["course_id"], unit["faculty_id"], d, mask)
+        unit["need"] += 1
+        unit["last"] = previous_last
+        counters["periods"] -= 2 if unit["course_type"] == "lab" else 1
+
+    def search():
+        if counters["periods"] > best["periods"]:
+            best["periods"] = counters["periods"]
+            best["stack"] = [(u, i) for (u, i, _, _, _) in stack]
+
+        open_units = [u for u in units if u["need"] > 0]
+        if not open_units:
+            return True
+        if time.monotonic() > deadline:
+            raise _BudgetExhausted()
+
+        # Forward check every open unit, pick the one with the least slack
+        chosen, chosen_domain = None, None
+        for unit in open_units:
+            dom = domain(unit)
+            if len(dom) < unit["need"]:
+                return False
+            if chosen is None or len(dom) - unit["need"] < len(chosen_domain) - chosen["need"]:
+                chosen, chosen_domain = unit, dom
+
+        for i in chosen_domain:
+            place(chosen, i)
+            if search():
+                return True
+            unplace()
+            counters["backtracks"] += 1
+            if counters["backtracks"] > max_backtracks:
+                raise _BudgetExhausted()
+        return False
+
+    timed_out = False
+    try:
+        solved = search()
+    except _BudgetExhausted:
+        solved = False
+        timed_out = True
+
+    if not solved:
+        # Roll back to the best partial solution seen, then first-fit the rest
+        while stack:
+            unplace()
+        for unit, i in best["stack"]:
+            place(unit, i)
+
+    rows = []
+    for unit, i, d, mask, _ in stack:
+        day = engine.days[d]
+        if unit["course_type"] == "lab":
+            p = engine.lab_slots[i][1]
+            rows.append((dept_id, semester, day, p, unit["course_id"], unit["faculty_id"]))
+            rows.append((dept_id, semester, day, p + 1, unit["course_id"], unit["faculty_id"]))
+        else:
+            p = engine.theory_slots[i][1]
+            rows.append((dept_id, semester, day, p, unit["course_id"], unit["faculty_id"]))
+
+    unplaced = []
+    for unit in units:
+        for _ in range(unit["need"]):
+            assignment = {k: unit[k] for k in ("course_id", "faculty_id", "course_type")}
+            placed = engine.place_assignment(dept_id, semester, assignment)
+            if placed:
+                rows.extend(placed)
+            else:
+                unplaced.append(assignment)
+        unit["need"] = 0
+
+    return rows, unplaced, timed_out
+
+
+def class_demand(engine, courses_list):
+    """Share of a class's week its courses need — used to solve the tightest classes first."""
+    periods = sum(_unit_periods(u) for u in _build_units(courses_list))
+    return periods / max(1, len(engine.theory_slots))
+
+
+def solve_classes(engine, classes, time_budget=DEFAULT_TIME_BUDGET,
+                  max_backtracks=DEFAULT_MAX_BACKTRACKS, rng=random, on_placed=None):
+    """
+    classes is a list of (dept_id, semester, courses_list).
+    Returns (rows, unplaced_by_class, timed_out) where unplaced_by_class is
+    [(dept_id, semester, [assignment, ...]), ...].
+    on_placed(dept_id, semester) is called after each class.
+    """
+    ordered = sorted(classes, key=lambda c: class_demand(engine, c[2]), reverse=True)
+    deadline = time.monotonic() + time_budget
+
+    rows = []
+    unplaced_by_class = []
+    any_timed_out = False
+    for n, (dept_id, semester, courses_list) in enumerate(ordered):
+        # Split what is left of the budget evenly over the classes still to solve
+        share = max(0.0, deadline - time.monotonic()) / (len(ordered) - n)
+        class_rows, unplaced, timed_out = solve_class(engine, dept_id, semester, courses_list,
+                                                      share, max_backtracks, rng)
+        rows.extend(class_rows)
+        if unplaced:
+            unplaced_by_class.append((dept_id, semester, unplaced))
+        any_timed_out = any_timed_out or timed_out
+        if on_placed:
+            on_placed(dept_id, semester)
+    return rows, unplaced_by_class, any_timed_out
@@ -0,0 +1,111 @@
+import numpy as np
+
+
+# =========================================================
+# ARRAY-BACKED TIMETABLE STATE
+# =========================================================
+# generated_timetable as dense arrays: one row per class (dept + semester) and
+# one per faculty, each a [day, period] grid. Index maps translate ids to array
+# positions. Whole-institution checks become array operations, and the grids
+# cost a few bytes per slot instead of a Python object each.
+#
+#   class_course[c, d, p]   course_id in that slot, 0 when free
+#   class_faculty[c, d, p]  faculty_id teaching it, 0 when free
+#   class_load[c, d, p]     rows stored for the slot (> 1 is a clash)
+#   faculty_load[f, d, p]   rows the faculty teaches in the slot (> 1 is a clash)
+#
+# Period p is stored at index p - 1.
+
+TIMETABLE_COLUMNS = "dept_id, semester, day, period, course_id, faculty_id"
+
+
+class TimetableState:
+    def __init__(self, days, periods_per_day, class_keys=(), faculty_ids=()):
+        self.days = tuple(days)
+        self.day_index = {day: i for i, day in enumerate(self.days)}
+        self.periods_per_day = periods_per_day
+        self.class_keys = list(class_keys)        # index -> (dept_id, semester)
+        self.class_index = {key: i for i, key in enumerate(self.class_keys)}
+        self.faculty_ids = list(faculty_ids)      # index -> faculty_id
+        self.faculty_index = {fid: i for i, fid in enumerate(self.faculty_ids)}
+
+        shape = (len(self.class_keys), len(self.days), periods_per_day)
+        self.class_course = np.zeros(shape, dtype=np.int32)
+        self.class_faculty = np.zeros(shape, dtype=np.int32)
+        self.class_load = np.zeros(shape, dtype=np.int16)
+        self.faculty_load = np.zeros((len(self.faculty_ids), len(self.days), periods_per_day), dtype=np.int16)
+        # Rows whose day or period the current settings no longer have
+        self.skipped = 0
+
+    @classmethod
+    def from_rows(cls, days, periods_per_day, rows):
+        """Builds the state from (dept_id, semester, day, period, course_id, faculty_id) rows."""
+        day_index = {day: i for i, day in enumerate(days)}
+        kept = [r for r in rows if r[2] in day_index and r[3] is not None and 1 <= r[3] <= periods_per_day]
+        class_keys = sorted({(r[0], r[1]) for r in kept})
+        faculty_ids = sorted({r[5] for r in kept if r[5] is not None})
+        state = cls(days, periods_per_day, class_keys, faculty_ids)
+        state.skipped = len(rows) - len(kept)
+        if not kept:
+            return state
+
+        c = np.fromiter((state.class_index[(r[0], r[1])] for r in kept), dtype=np.intp, count=len(kept))
+        d = np.fromiter((day_index[r[2]] for r in kept), dtype=np.intp, count=len(kept))
+        p = np.fromiter((r[3] - 1 for r in kept), dtype=np.intp, count=len(kept))
+        course = np.fromiter((r[4] or 0 for r in kept), dtype=np.int32, count=len(kept))
+        faculty = np.fromiter((r[5] or 0 for r in kept), dtype=np.int32, count=len(kept))
+        f = np.fromiter((state.faculty_index.get(r[5], -1) for r in kept), dtype=np.intp, count=len(kept))
+
+        np.add.at(state.class_load, (c, d, p), 1)
+        state.class_course[c, d, p] = course
+        state.class_faculty[c, d, p] = faculty
+        has_faculty = f >= 0
+        np.add.at(state.faculty_load, (f[has_faculty], d[has_faculty], p[has_faculty]), 1)
+        return state
+
+    @classmethod
+    def load(cls, conn, days, periods_per_day, dept_ids=None, exclude_dept_ids=()):
+        """Loads generated_timetable (all of it, or dept_ids only, minus exclude_dept_ids) with one query."""
+        sql = f"SELECT {TIMETABLE_COLUMNS} FROM generated_timetable WHERE 1=1"
+        params = []
+        if dept_ids is not None:
+            dept_ids = list(dept_ids)
+            if not dept_ids:
+                return cls(days, periods_per_day)
+            sql += f" AND dept_id IN ({','.join('?' * len(dept_ids))})"
+            params += dept_ids
+        if exclude_dept_ids:
+            exclude_dept_ids = list(exclude_dept_ids)
+            sql += f" AND dept_id NOT IN ({','.join('?' * len(exclude_dept_ids))})"
+            params += exclude_dept_ids
+        return cls.from_rows(days, periods_per_day, [tuple(row) for row in conn.execute(sql, params).fetchall()])
+
+    # ---------------------------------------------------------
+    # Views
+    # ---------------------------------------------------------
+    def rows(self):
+        """The occupied class slots back as generated_timetable rows (one per slot)."""
+        c, d, p = np.nonzero(self.class_course)
+        return [(*self.class_keys[ci], self.days[di], int(pi) + 1, int(course), int(faculty))
+                for ci, di, pi, course, faculty in zip(c.tolist(), d.tolist(), p.tolist(),
+                                                      self.class_course[c, d, p].tolist(),
+                                                      self.class_faculty[c, d, p].tolist())]
+
+    def faculty_busy_masks(self):
+        """{faculty_id: [busy period mask per day]} in the PlacementEngine bit layout (period p is 1 << p)."""
+        bits = np.left_shift(np.int64(1), np.arange(1, self.periods_per_day + 1, dtype=np.int64))
+        masks = ((self.faculty_load > 0).astype(np.int64) * bits).sum(axis=2)
+        return {fid: masks[i].tolist() for i, fid in enumerate(self.faculty_ids)}
+
+    def class_grid(self, dept_id, semester):
+        """{day: {period: course_id or None}} for one class."""
+        i = self.class_index.get((dept_id, semester))
+        grid = {day: {p: None for p in range(1, self.periods_per_day + 1)} for day in self.days}
+        if i is not None:
+            for d, p in zip(*np.nonzero(self.class_course[i])):
+                grid[self.days[d]][int(p) + 1] = int(self.class_course[i, d, p])
+        return grid
+
+    def nbytes(self):
+        return (self.class_course.nbytes + self.class_faculty.nbytes + self.class_load.nbytes
+                + self.faculty_load.nbytes)
@@ -0,0 +1,36 @@
+// Follows a background generation job on the generate page.
+// Include on a page with an element carrying data-generation-job="<job id>";
+// its [data-job-status] child (or the element itself) shows live progress
+// and the page reloads the preview once the job has finished.
+document.addEventListener("DOMContentLoaded", function () {
+    var box = document.querySelector("[data-generation-job]");
+    if (!box || !window.EventSource) return;
+
+    var jobId = box.getAttribute("data-generation-job");
+    var status = box.querySelector("[data-job-status]") || box;
+    var source = new EventSource("/api/generation-jobs/" + jobId + "/events");
+
+    source.onmessage = function (event) {
+        var job = JSON.parse(event.data);
+        var classes = 0, placed = 0;
+        for (var dept in job.progress) {
+            classes += job.progress[dept].classes;
+            placed += job.progress[dept].placed;
+        }
+
+        if (job.state === "queued") {
+            status.textContent = "Waiting for earlier generation jobs...";
+        } else if (job.state === "running" && job.stage === "optimizing") {
+            status.textContent = "Improving timetable (" + job.elapsed.toFixed(1) + "s)";
+        } else if (job.state === "running") {
+            status.textContent = "Generating: " + placed + " / " + classes + " classes placed (" +
+                job.elapsed.toFixed(1) + "s)";
+        } else {
+            source.close();
+            status.textContent = job.message;
+            if (job.state === "done") {
+                window.location.href = window.location.pathname;
+            }
+        }
+    };
+});
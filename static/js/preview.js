@@ -0,0 +1,52 @@
+// Lazily loads generated timetable grids on the generate page.
+// Each expandable preview is a <details data-preview-dept="<dept id>" data-preview-sem="<semester>">
+// holding a [data-preview-grid] container; the grid is fetched the first time it is opened.
+document.addEventListener("DOMContentLoaded", function () {
+    function esc(text) {
+        var div = document.createElement("div");
+        div.textContent = text == null ? "" : text;
+        return div.innerHTML;
+    }
+
+    function cell(entry) {
+        if (!entry) return "<td class=\"free\">-</td>";
+        return "<td class=\"" + esc(entry.course_type) + "\"><strong>" + esc(entry.course_code) + "</strong><br>" +
+            esc(entry.course_name) + "<br><small>" + esc(entry.faculty_name) + "</small></td>";
+    }
+
+    function render(data, semester) {
+        var grid = data.semesters[semester];
+        if (!grid) return "<p>No timetable generated for this semester.</p>";
+        var html = "<table class=\"tt-table\"><thead><tr><th>Day</th>";
+        for (var p = 1; p <= data.periods_per_day; p++) {
+            html += "<th>P" + p + "<br><small>" + esc(data.period_times[p]) + "</small></th>";
+            if (data.break_times[p]) html += "<th class=\"break\">Break</th>";
+        }
+        html += "</tr></thead><tbody>";
+        data.days.forEach(function (day) {
+            html += "<tr><th>" + esc(day) + "</th>";
+            for (var p = 1; p <= data.periods_per_day; p++) {
+                html += cell(grid[day][p]);
+                if (data.break_times[p]) html += "<td class=\"break\"></td>";
+            }
+            html += "</tr>";
+        });
+        return html + "</tbody></table>";
+    }
+
+    document.querySelectorAll("details[data-preview-dept]").forEach(function (box) {
+        box.addEventListener("toggle", function () {
+            if (!box.open || box.dataset.loaded) return;
+            box.dataset.loaded = "1";
+            var target = box.querySelector("[data-preview-grid]") || box;
+            var semester = box.dataset.previewSem;
+            fetch("/api/preview/" + box.dataset.previewDept + "/" + semester)
+                .then(function (response) { return response.json(); })
+                .then(function (data) { target.innerHTML = render(data, semester); })
+                .catch(function () {
+                    delete box.dataset.loaded;
+                    target.textContent = "Could not load this timetable.";
+                });
+        });
+    });
+});
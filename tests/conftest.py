@@ -0,0 +1,29 @@
+import argparse
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, get_db  # noqa: E402
+from benchmark import SCENARIOS, build_database  # noqa: E402
+
+
+def institution_options(scenario="small", **overrides):
+    options = dict(SCENARIOS[scenario], days=5, periods=7, breaks="2,4", seed=1)
+    options.update(overrides)
+    return argparse.Namespace(**options)
+
+
+@pytest.fixture
+def conn(tmp_path):
+    """A migrated database with timetable settings and a small synthetic institution, inside an app context."""
+    build_database(str(tmp_path / "timetable.db"), institution_options())
+    with app.app_context():
+        yield get_db()
+
+
+@pytest.fixture
+def client(conn):
+    return app.test_client()
@@ -0,0 +1,8 @@
+from app import PARALLEL_ATTEMPTS_ERROR, generate_timetable_logic
+
+
+def test_parallel_with_attempts_is_rejected(conn, client):
+    response = client.post("/api/generation-jobs", json={"dept_ids": [1], "parallel": True, "attempts": 3})
+    assert response.status_code == 400
+    assert response.get_json() == {"error": PARALLEL_ATTEMPTS_ERROR}
+    assert generate_timetable_logic([1], parallel=True, attempts=3) == (False, PARALLEL_ATTEMPTS_ERROR, None)
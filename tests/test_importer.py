@@ -0,0 +1,21 @@
+import pytest
+
+
+@pytest.mark.parametrize("body", [{"departments": 5}, {"courses": {"a": 1}}, {"faculties": "x"}])
+def test_entity_that_is_not_a_list_is_rejected(conn, client, body):
+    before = conn.execute("SELECT COUNT(*) FROM departments").fetchone()[0]
+    response = client.post("/api/import", json=dict(body, departments=body.get("departments", [
+        {"dept_id": 900, "dept_name": "New"}])))
+    assert response.status_code == 400
+    entity = next(iter(body))
+    assert response.get_json()["errors"] == [{"entity": entity, "row": None, "error": "must be a list of records"}]
+    assert conn.execute("SELECT COUNT(*) FROM departments").fetchone()[0] == before
+
+
+def test_record_that_is_not_an_object_is_reported_by_row(conn, client):
+    response = client.post("/api/import", json={"departments": [5, {"dept_id": 900, "dept_name": "New"}]})
+    assert response.status_code == 200
+    report = response.get_json()
+    assert report["inserted"]["departments"] == 1
+    assert report["errors"] == [{"entity": "departments", "row": 1,
+                                 "error": "record must be an object of field: value pairs"}]
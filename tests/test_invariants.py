@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+
+import app as app_module
+from app import generate_timetable_logic, place_course_logic
+from publish import rollback_departments
+from settings import get_settings
+from validator import validate_timetable
+
+
+def assert_no_double_booking(conn):
+    counts = validate_timetable(conn, get_settings(conn))["counts"]
+    assert counts["faculty_double_booked"] == 0
+    assert counts["class_double_booked"] == 0
+
+
+def timetable_rows(conn):
+    return sorted(tuple(row) for row in conn.execute(
+        "SELECT dept_id, semester, day, period, course_id, faculty_id FROM generated_timetable").fetchall())
+
+
+def dept_ids(conn):
+    return [row[0] for row in conn.execute("SELECT dept_id FROM departments ORDER BY dept_id").fetchall()]
+
+
+def add_course(client, conn, dept_id, credits=1):
+    faculty_id = conn.execute("SELECT faculty_id FROM faculties WHERE dept_id=? ORDER BY faculty_id",
+                              (dept_id,)).fetchone()[0]
+    response = client.post(f"/courses/{dept_id}", data={
+        "course_name": "Elective", "course_code": "EL101", "semester": "1", "credits": str(credits),
+        "faculty_id": str(faculty_id), "course_type": "theory"})
+    assert response.status_code == 302
+    return conn.execute("SELECT MAX(course_id) FROM courses").fetchone()[0]
+
+
+def test_generate_and_rollback_never_double_book(conn):
+    depts = dept_ids(conn)
+    success, message, _ = generate_timetable_logic(depts)
+    assert success, message
+    assert_no_double_booking(conn)
+
+    success, message, _ = generate_timetable_logic(depts[:1], mode="solver")
+    assert success, message
+    assert_no_double_booking(conn)
+
+    rolled_back, _ = rollback_departments(conn, depts[:1])
+    assert rolled_back == depts[:1]
+    assert_no_double_booking(conn)
+
+
+def test_added_course_is_placed_without_double_booking(conn, client):
+    generate_timetable_logic(dept_ids(conn))
+    before = len(timetable_rows(conn))
+    course_id = add_course(client, conn, dept_ids(conn)[0])
+    assert len(timetable_rows(conn)) == before + 1
+    assert conn.execute("SELECT COUNT(*) FROM generated_timetable WHERE course_id=?", (course_id,)).fetchone()[0] == 1
+    assert_no_double_booking(conn)
+
+
+def test_add_then_delete_course_leaves_the_timetable_unchanged(conn, client):
+    generate_timetable_logic(dept_ids(conn))
+    before = timetable_rows(conn)
+    dept_id = dept_ids(conn)[0]
+    course_id = add_course(client, conn, dept_id)
+    assert timetable_rows(conn) != before
+
+    assert client.get(f"/delete_course/{course_id}/{dept_id}").status_code == 302
+    assert timetable_rows(conn) == before
+
+
+def test_course_that_does_not_fit_is_regenerated_by_a_job(conn, client, monkeypatch):
+    submitted = []
+    monkeypatch.setattr(app_module.generation_jobs, "submit",
+                        lambda dept_ids, **options: submitted.append(dept_ids) or SimpleNamespace(id=1))
+    generate_timetable_logic(dept_ids(conn))
+    before = timetable_rows(conn)
+    dept_id = dept_ids(conn)[0]
+    course_id = add_course(client, conn, dept_id, credits=99)
+
+    assert submitted == [[dept_id]]
+    assert timetable_rows(conn) == before
+    success, message = place_course_logic(course_id)
+    assert not success and "job 1" in message
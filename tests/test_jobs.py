@@ -0,0 +1,13 @@
+from jobs import GenerationJob
+
+
+def test_to_dict_returns_a_copy_of_progress():
+    job = GenerationJob(1, [1, 2], {})
+    job.on_progress("planned", classes=[(1, 1), (1, 2), (2, 1)])
+    job.on_progress("placed", dept_id=1, semester=1)
+    progress = job.to_dict()["progress"]
+    assert progress == {"1": {"classes": 2, "placed": 1}, "2": {"classes": 1, "placed": 0}}
+
+    job.on_progress("placed", dept_id=1, semester=2)
+    assert progress["1"]["placed"] == 1
+    assert job.to_dict()["progress"]["1"]["placed"] == 2
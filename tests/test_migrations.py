@@ -0,0 +1,12 @@
+from database import get_backend
+from migrations import check_query_plans, current_version, migrate
+
+
+def test_fresh_database_hot_path_queries_use_indexes(tmp_path):
+    conn = get_backend("sqlite:///" + str(tmp_path / "fresh.db")).connect()
+    try:
+        migrate(conn)
+        assert current_version(conn) > 0
+        assert check_query_plans(conn) == {}
+    finally:
+        conn.close()
@@ -0,0 +1,19 @@
+from app import PREVIEW_SQL, generate_timetable_logic, preview_grids
+from settings import get_settings
+
+
+def test_preview_grids_match_the_generated_rows(conn, client):
+    generate_timetable_logic([1])
+    settings = get_settings(conn)
+    grids = preview_grids(conn.execute(PREVIEW_SQL).fetchall(), settings)
+    counts = dict(conn.execute(
+        "SELECT semester, COUNT(*) FROM generated_timetable WHERE dept_id=1 GROUP BY semester").fetchall())
+
+    assert set(grids) == {1}
+    for semester, grid in grids[1].items():
+        assert list(grid) == list(settings.days)
+        assert all(list(periods) == list(range(1, settings.periods_per_day + 1)) for periods in grid.values())
+        assert sum(entry is not None for periods in grid.values() for entry in periods.values()) == counts[semester]
+
+    data = client.get("/api/preview/1").get_json()
+    assert set(data["semesters"]) == {str(semester) for semester in counts}
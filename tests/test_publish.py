@@ -0,0 +1,64 @@
+from cache import get_version
+from publish import publish_stage, rollback_departments, stage_rows
+from settings import get_settings
+from validator import validate_timetable
+
+
+def faculty_of(conn, course_id):
+    return conn.execute("SELECT faculty_id FROM courses WHERE course_id=?", (course_id,)).fetchone()[0]
+
+
+def publish(conn, dept_ids, rows):
+    assert publish_stage(conn, stage_rows(conn, rows), dept_ids, get_version(conn, "generation"))
+
+
+def live_rows(conn, dept_id):
+    return sorted(tuple(row) for row in conn.execute("""
+        SELECT dept_id, semester, day, period, course_id, faculty_id FROM generated_timetable WHERE dept_id=?
+    """, (dept_id,)).fetchall())
+
+
+def shared_faculty_courses(conn):
+    """A course of department 1 and one of department 2 taught by the same faculty, after reassigning it."""
+    course_a, faculty = conn.execute(
+        "SELECT course_id, faculty_id FROM courses WHERE dept_id=1 ORDER BY course_id").fetchone()
+    course_b = conn.execute("SELECT course_id FROM courses WHERE dept_id=2 ORDER BY course_id").fetchone()[0]
+    conn.execute("UPDATE courses SET faculty_id=? WHERE course_id=?", (faculty, course_b))
+    conn.commit()
+    return course_a, course_b, faculty
+
+
+def test_rollback_refuses_previous_rows_that_double_book_a_faculty(conn, client):
+    course_a, course_b, faculty = shared_faculty_courses(conn)
+    first = [(1, 1, "Mon", 2, course_a, faculty)]
+    publish(conn, [1], first)
+    publish(conn, [1], [(1, 1, "Mon", 3, course_a, faculty)])
+    # Department 2 now holds the faculty in the slot department 1's previous timetable used
+    publish(conn, [2], [(2, 1, "Mon", 2, course_b, faculty)])
+
+    response = client.post("/api/generation/rollback", json={"dept_ids": [1]})
+    assert response.status_code == 200
+    assert response.get_json() == {
+        "rolled_back": [],
+        "unavailable": [],
+        "clashes": {"1": [{"faculty_id": faculty, "day": "Mon", "period": 2}]},
+    }
+    assert live_rows(conn, 1) == [(1, 1, "Mon", 3, course_a, faculty)]
+    assert validate_timetable(conn, get_settings(conn))["counts"]["faculty_double_booked"] == 0
+
+    # Once department 2 moves off the slot the rollback goes through
+    publish(conn, [2], [(2, 1, "Mon", 4, course_b, faculty)])
+    assert rollback_departments(conn, [1]) == ([1], {})
+    assert live_rows(conn, 1) == first
+
+
+def test_rollback_checks_departments_rolled_back_together(conn):
+    course_a, course_b, faculty = shared_faculty_courses(conn)
+    publish(conn, [1], [(1, 1, "Mon", 2, course_a, faculty)])
+    publish(conn, [1], [(1, 1, "Thu", 2, course_a, faculty)])
+    publish(conn, [2], [(2, 1, "Mon", 2, course_b, faculty)])
+    publish(conn, [2], [(2, 1, "Fri", 2, course_b, faculty)])
+
+    # Each previous timetable is free against the other's live rows, but not against its previous ones
+    assert rollback_departments(conn, [1, 2]) == ([], {1: [(faculty, "Mon", 2)], 2: [(faculty, "Mon", 2)]})
+    assert validate_timetable(conn, get_settings(conn))["counts"]["faculty_double_booked"] == 0
@@ -0,0 +1,139 @@
+import time
+
+import numpy as np
+
+from state import TimetableState
+
+
+# =========================================================
+# TIMETABLE VALIDATOR
+# =========================================================
+# Checks every hard constraint over the whole stored timetable: one query
+# loads generated_timetable with its course and faculty references, the slot
+# clashes and adjacency checks run on the TimetableState arrays, and the lab
+# and reference checks group the loaded rows in a single pass.
+
+VALIDATE_SELECT = """
+    SELECT gt.id, gt.dept_id, gt.semester, gt.day, gt.period, gt.course_id, gt.faculty_id,
+           c.course_id IS NOT NULL AS course_exists, c.course_type, c.faculty_id AS course_faculty_id,
+           f.faculty_id IS NOT NULL AS faculty_exists
+    FROM generated_timetable gt
+    LEFT JOIN courses c ON gt.course_id = c.course_id
+    LEFT JOIN faculties f ON gt.faculty_id = f.faculty_id
+"""
+
+VIOLATION_KINDS = (
+    "faculty_double_booked",   # a faculty in two places in one slot
+    "class_double_booked",     # a class with two rows in one slot
+    "adjacent_same_course",    # one theory course in consecutive periods of a day
+    "lab_split_by_break",      # a lab pair with a break between its periods
+    "lab_unpaired",            # a lab period without its consecutive partner
+    "unknown_course",          # course_id no longer in courses
+    "unknown_faculty",         # faculty_id no longer in faculties
+    "faculty_mismatch",        # row's faculty is not the course's faculty (e.g. a reused faculty id)
+    "outside_settings",        # day or period the current settings no longer have
+)
+
+
+def validate_timetable(conn, settings, dept_ids=None):
+    """
+    Returns {"ok", "checked_rows", "seconds", "counts": {kind: n}, "violations": {kind: [...]}}.
+    dept_ids limits the report to those departments; faculty clashes still count
+    every department's rows.
+    """
+    started = time.perf_counter()
+    rows = [tuple(row) for row in conn.execute(VALIDATE_SELECT).fetchall()]
+    days = settings.days
+    periods_per_day = settings.periods_per_day
+    breaks = settings.break_after_periods
+    day_set = set(days)
+    wanted = set(dept_ids) if dept_ids is not None else None
+    violations = {kind: [] for kind in VIOLATION_KINDS}
+
+    def reported(dept_id):
+        return wanted is None or dept_id in wanted
+
+    # Reference checks in one pass over the rows
+    lab_periods = {}  # (dept_id, semester, day, course_id) -> [(period, row id)]
+    lab_courses = set()
+    for (row_id, dept_id, semester, day, period, course_id, faculty_id,
+         course_exists, course_type, course_faculty_id, faculty_exists) in rows:
+        if day not in day_set or period is None or not 1 <= period <= periods_per_day:
+            if reported(dept_id):
+                violations["outside_settings"].append({"id": row_id, "dept_id": dept_id, "semester": semester,
+                                                       "day": day, "period": period})
+            continue
+        if not reported(dept_id):
+            continue
+        if not course_exists:
+            violations["unknown_course"].append({"id": row_id, "dept_id": dept_id, "semester": semester,
+                                                 "course_id": course_id})
+        if not faculty_exists:
+            violations["unknown_faculty"].append({"id": row_id, "dept_id": dept_id, "semester": semester,
+                                                  "faculty_id": faculty_id})
+        elif course_exists and course_faculty_id != faculty_id:
+            violations["faculty_mismatch"].append({"id": row_id, "dept_id": dept_id, "semester": semester,
+                                                   "course_id": course_id, "faculty_id": faculty_id,
+                                                   "course_faculty_id": course_faculty_id})
+        if course_type == "lab":
+            lab_courses.add(course_id)
+            lab_periods.setdefault((dept_id, semester, day, course_id), []).append((period, row_id))
+
+    # Slot clashes and adjacency on the arrays
+    state = TimetableState.from_rows(days, periods_per_day, [r[1:7] for r in rows])
+    faculty_clashes = {(state.faculty_ids[f], days[d], p + 1): []
+                       for f, d, p in np.argwhere(state.faculty_load > 1).tolist()}
+    class_clashes = {(*state.class_keys[c], days[d], p + 1): []
+                     for c, d, p in np.argwhere(state.class_load > 1).tolist()}
+    if faculty_clashes or class_clashes:
+        # Second pass only to name the rows behind each clash
+        for row_id, dept_id, semester, day, period, _, faculty_id, *_ in rows:
+            if (faculty_id, day, period) in faculty_clashes:
+                faculty_clashes[(faculty_id, day, period)].append((row_id, dept_id))
+            if (dept_id, semester, day, period) in class_clashes:
+                class_clashes[(dept_id, semester, day, period)].append(row_id)
+    for (faculty_id, day, period), booked in faculty_clashes.items():
+        if any(reported(dept_id) for _, dept_id in booked):
+            violations["faculty_double_booked"].append({"faculty_id": faculty_id, "day": day, "period": period,
+                                                        "ids": [row_id for row_id, _ in booked],
+                                                        "dept_ids": sorted({dept_id for _, dept_id in booked})})
+    for (dept_id, semester, day, period), ids in class_clashes.items():
+        if reported(dept_id):
+            violations["class_double_booked"].append({"dept_id": dept_id, "semester": semester, "day": day,
+                                                      "period": period, "ids": ids})
+
+    course = state.class_course
+    theory = (course != 0) & ~np.isin(course, list(lab_courses))
+    adjacent = theory[:, :, :-1] & (course[:, :, :-1] == course[:, :, 1:])
+    for c, d, p in np.argwhere(adjacent).tolist():
+        (dept_id, semester), day = state.class_keys[c], days[d]
+        if reported(dept_id):
+            violations["adjacent_same_course"].append({"dept_id": dept_id, "semester": semester, "day": day,
+                                                       "periods": [p + 1, p + 2],
+                                                       "course_id": int(course[c, d, p])})
+
+    # Labs: each course's periods on a day must pair up as (p, p + 1) with no break after p
+    for (dept_id, semester, day, course_id), periods in lab_periods.items():
+        periods.sort()
+        i = 0
+        while i < len(periods):
+            period, row_id = periods[i]
+            if i + 1 < len(periods) and periods[i + 1][0] == period + 1:
+                if period in breaks:
+                    violations["lab_split_by_break"].append({
+                        "dept_id": dept_id, "semester": semester, "day": day, "course_id": course_id,
+                        "periods": [period, period + 1], "ids": [row_id, periods[i + 1][1]]})
+                i += 2
+            else:
+                violations["lab_unpaired"].append({"dept_id": dept_id, "semester": semester, "day": day,
+                                                   "course_id": course_id, "period": period, "id": row_id})
+                i += 1
+
+    counts = {kind: len(found) for kind, found in violations.items()}
+    return {
+        "ok": not any(counts.values()),
+        "checked_rows": len(rows),
+        "seconds": round(time.perf_counter() - started, 4),
+        "counts": counts,
+        "violations": violations,
+    }
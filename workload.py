@@ -0,0 +1,94 @@
+import json
+
+from scoring import mask_gaps
+
+
+# =========================================================
+# FACULTY WORKLOAD REPORTS
+# =========================================================
+# One faculty_workload row per timetabled faculty. It is rewritten together
+# with the faculty's timetable snapshot (see snapshots.refresh_snapshots),
+# from the same rows. So every generation and every edit keeps it current
+# without another pass over generated_timetable, and the report only reads
+# this table.
+
+WORKLOAD_COLUMNS = ("total_periods", "teaching_days", "peak_day_periods", "max_run", "runs", "gap_periods",
+                    "departments_served")
+
+# ?sort= values of the report and the column each orders by
+SORT_COLUMNS = dict({"faculty_id": "f.faculty_id", "faculty_name": "f.faculty_name"},
+                    **{column: f"COALESCE(w.{column}, 0)" for column in WORKLOAD_COLUMNS})
+
+
+def summarize(cells, dept_ids):
+    """Aggregates one faculty's snapshot cells ({"day", "period", ...}) taught for dept_ids."""
+    per_day = {}
+    masks = {}
+    for cell in cells:
+        per_day[cell["day"]] = per_day.get(cell["day"], 0) + 1
+        masks[cell["day"]] = masks.get(cell["day"], 0) | (1 << cell["period"])
+
+    runs = max_run = 0
+    for mask in masks.values():
+        # A run starts at every taught period whose predecessor is free
+        runs += bin(mask & ~(mask << 1)).count("1")
+        run = mask
+        length = 0
+        while run:
+            run &= run << 1
+            length += 1
+        max_run = max(max_run, length)
+
+    return {
+        "total_periods": len(cells),
+        "teaching_days": len(per_day),
+        "peak_day_periods": max(per_day.values(), default=0),
+        "max_run": max_run,
+        "runs": runs,
+        "gap_periods": sum(mask_gaps(mask) for mask in masks.values()),
+        "departments_served": len(dept_ids),
+        "periods_per_day": per_day,
+        "dept_ids": sorted(dept_ids),
+    }
+
+
+def delete_workloads(conn, faculty_ids):
+    conn.execute(f"DELETE FROM faculty_workload WHERE faculty_id IN ({','.join('?' * len(faculty_ids))})",
+                 list(faculty_ids))
+
+
+def write_workload(conn, faculty_id, summary):
+    conn.execute(f"""
+        INSERT INTO faculty_workload (faculty_id, {", ".join(WORKLOAD_COLUMNS)}, periods_per_day, dept_ids)
+        VALUES (?, {", ".join("?" * len(WORKLOAD_COLUMNS))}, ?, ?)
+    """, (faculty_id, *(summary[column] for column in WORKLOAD_COLUMNS),
+          json.dumps(summary["periods_per_day"]), json.dumps(summary["dept_ids"])))
+
+
+def list_workloads(conn, sort="total_periods", descending=True, page=1, per_page=25, dept_id=None):
+    """
+    One page of faculties (every faculty, untimetabled ones with zero load)
+    ordered by SORT_COLUMNS[sort]. Returns (total faculties, rows).
+    """
+    where, params = "", []
+    if dept_id is not None:
+        where, params = "WHERE f.dept_id=?", [dept_id]
+    total = conn.execute(f"SELECT COUNT(*) FROM faculties f {where}", params).fetchone()[0]
+    rows = conn.execute(f"""
+        SELECT f.faculty_id, f.faculty_name, f.dept_id, {", ".join(f"w.{c}" for c in WORKLOAD_COLUMNS)},
+               w.periods_per_day, w.dept_ids
+        FROM faculties f
+        LEFT JOIN faculty_workload w ON w.faculty_id = f.faculty_id
+        {where}
+        ORDER BY {SORT_COLUMNS[sort]} {"DESC" if descending else "ASC"}, f.faculty_id
+        LIMIT ? OFFSET ?
+    """, params + [per_page, (page - 1) * per_page]).fetchall()
+
+    faculties = []
+    for row in rows:
+        entry = {"faculty_id": row["faculty_id"], "faculty_name": row["faculty_name"], "dept_id": row["dept_id"]}
+        entry.update({column: row[column] or 0 for column in WORKLOAD_COLUMNS})
+        entry["periods_per_day"] = json.loads(row["periods_per_day"]) if row["periods_per_day"] else {}
+        entry["dept_ids"] = json.loads(row["dept_ids"]) if row["dept_ids"] else []
+        faculties.append(entry)
+    return total, faculties